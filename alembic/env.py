@@ -1,6 +1,5 @@
 import asyncio
 from logging.config import fileConfig
-import os
 from dotenv import load_dotenv
 
 from sqlalchemy import pool
@@ -16,9 +15,12 @@ load_dotenv()
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with environment variables
-db_url = f"mysql+aiomysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-config.set_main_option("sqlalchemy.url", db_url)
+# Override sqlalchemy.url with the application's database settings
+from app.core.config import settings
+config.set_main_option("sqlalchemy.url", settings.ASYNC_DATABASE_URL.replace("%", "%%"))
+
+# SQLite cannot ALTER most things in place; batch mode recreates the table instead
+render_as_batch = settings.DB_BACKEND == "sqlite"
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -55,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=render_as_batch,
     )
 
     with context.begin_transaction():
@@ -62,7 +65,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=render_as_batch,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,36 @@
+"""session id on logged answers
+
+Revision ID: answer_sessions_004
+Revises: quiz_sessions_003
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'answer_sessions_004'
+down_revision: Union[str, None] = 'quiz_sessions_003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Batch mode so SQLite, which cannot add a foreign key in place, recreates the table.
+    # Answers logged before this revision keep a NULL session
+    with op.batch_alter_table('quiz_answers') as batch_op:
+        batch_op.add_column(sa.Column('session_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_quiz_answers_session_id', 'quiz_sessions', ['session_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(batch_op.f('ix_quiz_answers_session_id'), ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quiz_answers') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quiz_answers_session_id'))
+        batch_op.drop_constraint('fk_quiz_answers_session_id', type_='foreignkey')
+        batch_op.drop_column('session_id')
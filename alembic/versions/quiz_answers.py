@@ -0,0 +1,45 @@
+"""quiz answers log
+
+Revision ID: quiz_answers_002
+Revises: initial_schema_001
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'quiz_answers_002'
+down_revision: Union[str, None] = 'initial_schema_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create quiz_answers table
+    op.create_table(
+        'quiz_answers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('answer', sa.Integer(), nullable=False),
+        sa.Column('is_correct', sa.Boolean(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('answered_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_answers_id'), 'quiz_answers', ['id'], unique=False)
+    op.create_index(op.f('ix_quiz_answers_quiz_id'), 'quiz_answers', ['quiz_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_quiz_answers_quiz_id'), table_name='quiz_answers')
+    op.drop_index(op.f('ix_quiz_answers_id'), table_name='quiz_answers')
+    op.drop_table('quiz_answers')
@@ -0,0 +1,76 @@
+"""quiz sessions, archived scores and user stats
+
+Revision ID: quiz_sessions_003
+Revises: quiz_answers_002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'quiz_sessions_003'
+down_revision: Union[str, None] = 'quiz_answers_002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create quiz_sessions table
+    op.create_table(
+        'quiz_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('participant_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_sessions_id'), 'quiz_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_quiz_sessions_quiz_id'), 'quiz_sessions', ['quiz_id'], unique=False)
+
+    # Create quiz_session_scores table
+    op.create_table(
+        'quiz_session_scores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['quiz_sessions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_session_scores_id'), 'quiz_session_scores', ['id'], unique=False)
+    op.create_index(op.f('ix_quiz_session_scores_session_id'), 'quiz_session_scores', ['session_id'], unique=False)
+    op.create_index(op.f('ix_quiz_session_scores_user_id'), 'quiz_session_scores', ['user_id'], unique=False)
+
+    # Create user_stats table
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('sessions_played', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('best_score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('best_rank', sa.Integer(), nullable=True),
+        sa.Column('last_played_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
+    op.drop_index(op.f('ix_quiz_session_scores_user_id'), table_name='quiz_session_scores')
+    op.drop_index(op.f('ix_quiz_session_scores_session_id'), table_name='quiz_session_scores')
+    op.drop_index(op.f('ix_quiz_session_scores_id'), table_name='quiz_session_scores')
+    op.drop_table('quiz_session_scores')
+    op.drop_index(op.f('ix_quiz_sessions_quiz_id'), table_name='quiz_sessions')
+    op.drop_index(op.f('ix_quiz_sessions_id'), table_name='quiz_sessions')
+    op.drop_table('quiz_sessions')
@@ -0,0 +1,69 @@
+import numpy as np
+from typing import List, Sequence, Tuple
+
+def compute_quiz_analytics(
+    answers: np.ndarray,
+    question_ids: Sequence[int],
+    option_counts: Sequence[int],
+) -> Tuple[List[dict], List[dict]]:
+    """Aggregate an answer log into per-question and per-user statistics.
+
+    `answers` is an (n, 4) int array of (question_id, user_id, answer, is_correct)
+    rows. Everything is computed with array aggregation, there is no per-row
+    Python loop.
+    """
+    qids = np.asarray(question_ids, dtype=np.int64)
+    order = np.argsort(qids)
+    qids = qids[order]
+    n_questions = len(qids)
+    n_options = max(max(option_counts, default=0), 1)
+
+    answers = np.asarray(answers, dtype=np.int64).reshape(-1, 4)
+    answer_qid = answers[:, 0]
+    answer_uid = answers[:, 1]
+    chosen = answers[:, 2]
+    correct = answers[:, 3].astype(bool)
+
+    # Map each answer to its question's row, dropping answers for deleted questions
+    if n_questions:
+        q_idx = np.searchsorted(qids, answer_qid).clip(0, n_questions - 1)
+        known = qids[q_idx] == answer_qid
+    else:
+        q_idx = np.zeros(len(answers), dtype=np.int64)
+        known = np.zeros(len(answers), dtype=bool)
+
+    attempts = np.bincount(q_idx[known], minlength=n_questions)
+    correct_counts = np.bincount(q_idx[known & correct], minlength=n_questions)
+
+    in_range = known & (chosen >= 0) & (chosen < n_options)
+    distribution = np.bincount(
+        q_idx[in_range] * n_options + chosen[in_range],
+        minlength=n_questions * n_options,
+    ).reshape(n_questions, n_options)
+
+    question_stats = [None] * n_questions
+    for row, original in enumerate(order):
+        question_stats[original] = {
+            "question_id": int(qids[row]),
+            "attempts": int(attempts[row]),
+            "correct": int(correct_counts[row]),
+            "correct_rate": float(correct_counts[row] / attempts[row]) if attempts[row] else 0.0,
+            "option_distribution": distribution[row, :option_counts[original]].tolist(),
+        }
+
+    user_ids, u_idx = np.unique(answer_uid, return_inverse=True)
+    user_attempts = np.bincount(u_idx, minlength=len(user_ids))
+    user_correct = np.bincount(u_idx[correct], minlength=len(user_ids))
+    accuracy = user_correct / np.maximum(user_attempts, 1)
+
+    user_stats = [
+        {
+            "user_id": int(user_id),
+            "answered": int(n),
+            "correct": int(c),
+            "accuracy": float(acc),
+        }
+        for user_id, n, c, acc in zip(user_ids.tolist(), user_attempts, user_correct, accuracy)
+    ]
+    user_stats.sort(key=lambda x: x["accuracy"], reverse=True)
+    return question_stats, user_stats
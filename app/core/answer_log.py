@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, mark_write
+from app.models.quiz_answer import QuizAnswer
+
+logger = logging.getLogger(__name__)
+
+class AnswerLog:
+    """Buffers submitted answers and writes them to quiz_answers in batches.
+
+    The websocket path only appends to an in-memory buffer; a single background
+    task flushes it with one multi-row INSERT per batch. Rows that cannot be
+    written stay buffered for the next flush, up to max_buffer rows; past
+    that the oldest are dropped and counted in stats.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.stats = {"dropped": 0}
+        self._buffer: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def record(
+        self, quiz_id: int, session_id: Optional[int], question_id: int, user_id: int,
+        answer: int, is_correct: bool, score: float
+    ):
+        """Queue an answer row for the next batch"""
+        if len(self._buffer) >= self.max_buffer:
+            # The database has been failing for a while; keep the rows already queued
+            self.stats["dropped"] += 1
+            return
+        self._buffer.append({
+            "quiz_id": quiz_id,
+            "session_id": session_id,
+            "question_id": question_id,
+            "user_id": user_id,
+            "answer": answer,
+            "is_correct": is_correct,
+            "score": score,
+            "answered_at": datetime.utcnow(),
+        })
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write all buffered rows"""
+        async with self._lock:
+            while self._buffer:
+                rows = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await db.execute(QuizAnswer.__table__.insert(), rows)
+                        await db.commit()
+                    mark_write(*{row["quiz_id"] for row in rows})
+                except Exception as e:
+                    # Put the rows back so the next flush retries them
+                    logger.error(f"Error writing answer log batch: {str(e)}")
+                    self._buffer[:0] = rows
+                    overflow = len(self._buffer) - self.max_buffer
+                    if overflow > 0:
+                        del self._buffer[:overflow]
+                        self.stats["dropped"] += overflow
+                    return
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stop the background flusher and write what is left"""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+answer_log = AnswerLog(
+    settings.ANSWER_LOG_BATCH_SIZE, settings.ANSWER_LOG_FLUSH_INTERVAL, settings.ANSWER_LOG_MAX_BUFFER
+)
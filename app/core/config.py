@@ -12,9 +12,92 @@ class Settings(BaseSettings):
     DB_PORT: str = os.getenv("DB_PORT", "3306")
     DB_NAME: str = os.getenv("DB_NAME", "elsa_db")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
+
+    # "mysql" (default) or "sqlite" for an embedded single-node database at SQLITE_PATH
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mysql")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "elsa.db")
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+
+    # Optional read replica (full SQLAlchemy async URL); reads stay on the primary
+    # for REPLICA_LAG_WINDOW seconds after a write to the same quiz
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    REPLICA_LAG_WINDOW: float = float(os.getenv("REPLICA_LAG_WINDOW", "2"))
+
+    # Answer log: rows are buffered and written with multi-row inserts; while
+    # writes fail at most ANSWER_LOG_MAX_BUFFER rows are kept for retrying
+    ANSWER_LOG_BATCH_SIZE: int = int(os.getenv("ANSWER_LOG_BATCH_SIZE", "500"))
+    ANSWER_LOG_FLUSH_INTERVAL: float = float(os.getenv("ANSWER_LOG_FLUSH_INTERVAL", "0.5"))
+    ANSWER_LOG_MAX_BUFFER: int = int(os.getenv("ANSWER_LOG_MAX_BUFFER", "100000"))
+
+    # Server-driven question timing (QuizSettings.timeLimit is seconds per question)
+    TIMER_WHEEL_TICK: float = float(os.getenv("TIMER_WHEEL_TICK", "0.1"))
+    TIMER_WHEEL_SLOTS: int = int(os.getenv("TIMER_WHEEL_SLOTS", "512"))
+    # Answers up to this many seconds past the deadline still count; the room advances after it
+    ANSWER_LATE_GRACE: float = float(os.getenv("ANSWER_LATE_GRACE", "0.5"))
+
+    # Dropped sockets keep their seat for this many seconds (0 disables resuming)
+    WS_RECONNECT_GRACE: float = float(os.getenv("WS_RECONNECT_GRACE", "30"))
+    WS_REPLAY_BUFFER_SIZE: int = int(os.getenv("WS_REPLAY_BUFFER_SIZE", "256"))
+
+    # Room broadcasts run on the room's actor; a player socket that takes longer than
+    # this to accept a frame is dropped and closed (it can resume) instead of stalling the room
+    WS_SEND_TIMEOUT: float = float(os.getenv("WS_SEND_TIMEOUT", "2"))
+
+    # Application-level heartbeat (replaces the disabled uvicorn ping/pong)
+    WS_HEARTBEAT_INTERVAL: float = float(os.getenv("WS_HEARTBEAT_INTERVAL", "15"))
+    WS_HEARTBEAT_TIMEOUT: float = float(os.getenv("WS_HEARTBEAT_TIMEOUT", "45"))
+    WS_HEARTBEAT_BATCH_SIZE: int = int(os.getenv("WS_HEARTBEAT_BATCH_SIZE", "1000"))
+
+    # Joins to the same room within this window are admitted as one batch
+    WS_JOIN_BATCH_WINDOW: float = float(os.getenv("WS_JOIN_BATCH_WINDOW", "0.05"))
+    WS_JOIN_BATCH_MAX: int = int(os.getenv("WS_JOIN_BATCH_MAX", "500"))
+
+    # Live room state checkpoints, reloaded at startup
+    SNAPSHOT_PATH: str = os.getenv("SNAPSHOT_PATH", "room_state.snapshot")
+    SNAPSHOT_INTERVAL: float = float(os.getenv("SNAPSHOT_INTERVAL", "5"))
+
+    # Websocket admission control: "type:rate_per_second:burst", "default" applies to every message
+    WS_RATE_LIMITS: str = os.getenv(
+        "WS_RATE_LIMITS",
+        "default:20:40,submit_answer:5:10,submit_answers:1:5,start_quiz:0.2:2,end_quiz:0.2:2"
+    )
+    # Most answers one submit_answers frame may carry
+    WS_ANSWER_BATCH_MAX: int = int(os.getenv("WS_ANSWER_BATCH_MAX", "100"))
+    WS_ROOM_DB_CONCURRENCY: int = int(os.getenv("WS_ROOM_DB_CONCURRENCY", "8"))
+    WS_ROOM_DB_QUEUE: int = int(os.getenv("WS_ROOM_DB_QUEUE", "64"))
+    WS_ROOM_DB_MAX_WAIT: float = float(os.getenv("WS_ROOM_DB_MAX_WAIT", "2"))
+    # Frames read but not yet handled, per connection; more are refused with a queue_full error
+    WS_MESSAGE_QUEUE_SIZE: int = int(os.getenv("WS_MESSAGE_QUEUE_SIZE", "32"))
+
+    # Opt-in frame recording for replay (benchmarks/replay_session.py); empty path disables it
+    WS_RECORD_PATH: str = os.getenv("WS_RECORD_PATH", "")
+    # Comma-separated room codes to record, empty for every room
+    WS_RECORD_ROOMS: str = os.getenv("WS_RECORD_ROOMS", "")
+    WS_RECORD_FLUSH_INTERVAL: float = float(os.getenv("WS_RECORD_FLUSH_INTERVAL", "1"))
+
+    # Spectators (?role=spectator) get room frames once per interval, leaderboards coalesced
+    WS_SPECTATOR_INTERVAL: float = float(os.getenv("WS_SPECTATOR_INTERVAL", "1"))
+    WS_SPECTATOR_SEND_BATCH: int = int(os.getenv("WS_SPECTATOR_SEND_BATCH", "500"))
+    WS_SPECTATOR_SEND_TIMEOUT: float = float(os.getenv("WS_SPECTATOR_SEND_TIMEOUT", "5"))
+
+    # Multiplexed monitor sockets (/ws/monitor): rooms per socket and frames queued before a slow one is closed
+    WS_MONITOR_MAX_ROOMS: int = int(os.getenv("WS_MONITOR_MAX_ROOMS", "100"))
+    WS_MONITOR_QUEUE_SIZE: int = int(os.getenv("WS_MONITOR_QUEUE_SIZE", "1000"))
+
+    # REST responses: validate hand-built payloads against their schema (turn off in production)
+    VALIDATE_RESPONSES: bool = os.getenv("VALIDATE_RESPONSES", "true").lower() == "true"
+    QUIZ_RESPONSE_CACHE_SIZE: int = int(os.getenv("QUIZ_RESPONSE_CACHE_SIZE", "1024"))
+
+    # Comma-separated emails allowed to use the admin endpoints (profiler)
+    ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+    # On-demand sampling profiler: seconds between samples and the longest allowed window
+    PROFILER_INTERVAL: float = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+    PROFILER_MAX_DURATION: float = float(os.getenv("PROFILER_MAX_DURATION", "60"))
     
     @property
     def ASYNC_DATABASE_URL(self) -> str:
+        if self.DB_BACKEND == "sqlite":
+            return f"sqlite+aiosqlite:///{self.SQLITE_PATH}"
         return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
     class Config:
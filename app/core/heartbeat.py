@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+from fastapi import WebSocket
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class HeartbeatSweeper:
+    """Application-level heartbeat for all websockets, driven by one sweeper task.
+
+    Connections only record when they were last heard from; any inbound
+    frame counts. Every `interval` seconds the sweeper walks those timestamps
+    in batches, pings sockets that have been quiet for an interval and evicts
+    the ones quiet for `timeout`. ASGI does not expose protocol-level pings,
+    so the ping is a {"type": "ping"} frame that clients answer with a pong.
+    """
+
+    def __init__(self, interval: float, timeout: float, batch_size: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.last_seen: Dict[WebSocket, float] = {}
+        self.on_evict: Optional[Callable[[WebSocket], None]] = None
+        self.stats = {"sweeps": 0, "pings_sent": 0, "evictions": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, websocket: WebSocket):
+        self.last_seen[websocket] = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def touch(self, websocket: WebSocket):
+        """Record that a frame was just received from this socket"""
+        if websocket in self.last_seen:
+            self.last_seen[websocket] = time.monotonic()
+
+    def unregister(self, websocket: WebSocket):
+        self.last_seen.pop(websocket, None)
+
+    async def _ping(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.send_json({"type": "ping"}), timeout=self.interval)
+            self.stats["pings_sent"] += 1
+        except Exception:
+            # A failed ping means the socket is gone
+            await self._evict(websocket)
+
+    async def _evict(self, websocket: WebSocket):
+        if self.last_seen.pop(websocket, None) is None:
+            return
+        self.stats["evictions"] += 1
+        if self.on_evict is not None:
+            self.on_evict(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=4008, reason="Heartbeat timeout"), timeout=self.interval)
+        except Exception:
+            pass
+
+    async def sweep(self):
+        websockets = list(self.last_seen)
+        for start in range(0, len(websockets), self.batch_size):
+            # Read the timestamps per batch: earlier batches may have waited on
+            # pings and closes while these sockets kept sending frames
+            now = time.monotonic()
+            stale: List[WebSocket] = []
+            quiet: List[WebSocket] = []
+            for websocket in websockets[start:start + self.batch_size]:
+                seen = self.last_seen.get(websocket)
+                if seen is None:
+                    continue
+                idle = now - seen
+                if idle >= self.timeout:
+                    stale.append(websocket)
+                elif idle >= self.interval:
+                    quiet.append(websocket)
+            if stale or quiet:
+                await asyncio.gather(
+                    *(self._evict(ws) for ws in stale),
+                    *(self._ping(ws) for ws in quiet)
+                )
+            else:
+                # Let other tasks run between batches
+                await asyncio.sleep(0)
+        self.stats["sweeps"] += 1
+
+    async def _run(self):
+        while self.last_seen:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error in heartbeat sweep: {str(e)}")
+
+heartbeat = HeartbeatSweeper(
+    settings.WS_HEARTBEAT_INTERVAL,
+    settings.WS_HEARTBEAT_TIMEOUT,
+    settings.WS_HEARTBEAT_BATCH_SIZE
+)
@@ -0,0 +1,63 @@
+import hashlib
+from typing import List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+class KeyedPermutation:
+    """Pseudo-random permutation of range(n) that is computed, never stored.
+
+    A balanced Feistel network with a keyed BLAKE2b round function permutes
+    the smallest even-width bit domain that holds n; values that land
+    outside range(n) are fed through again (cycle walking). The domain is
+    under 4n, so both directions take a few rounds per call, in O(1)
+    memory, whatever the size of n.
+    """
+    __slots__ = ("key", "n", "half", "mask")
+
+    ROUNDS = 4
+
+    def __init__(self, key: bytes, n: int):
+        # BLAKE2b takes keys of up to 64 bytes
+        self.key = key
+        self.n = n
+        bits = max(2, (n - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.mask = (1 << self.half) - 1
+
+    def _round(self, i: int, value: int) -> int:
+        digest = hashlib.blake2b(bytes((i,)) + value.to_bytes(4, "little"), key=self.key, digest_size=4).digest()
+        return int.from_bytes(digest, "little") & self.mask
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self.half, x & self.mask
+        for i in range(self.ROUNDS):
+            left, right = right, left ^ self._round(i, right)
+        return (left << self.half) | right
+
+    def _decrypt(self, x: int) -> int:
+        left, right = x >> self.half, x & self.mask
+        for i in reversed(range(self.ROUNDS)):
+            left, right = right ^ self._round(i, left), left
+        return (left << self.half) | right
+
+    def forward(self, index: int) -> int:
+        """Position that original item `index` is moved to"""
+        if self.n <= 1:
+            return index
+        x = self._encrypt(index)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+    def inverse(self, position: int) -> int:
+        """Original index of the item shown at `position`"""
+        if self.n <= 1:
+            return position
+        x = self._decrypt(position)
+        while x >= self.n:
+            x = self._decrypt(x)
+        return x
+
+    def apply(self, items: Sequence[T]) -> List[T]:
+        """The items in permuted order"""
+        return [items[self.inverse(position)] for position in range(self.n)]
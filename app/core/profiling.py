@@ -0,0 +1,175 @@
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+class _Span:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: "SpanRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class SpanRecorder:
+    """Always-on timing spans: count, total and max wall time per name.
+
+    Each span costs two perf_counter() calls and a list update, so it stays
+    on in production; spans around awaits include the time spent waiting.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, List[float]] = {}  # name -> [count, total seconds, max seconds]
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def record(self, name: str, elapsed: float):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, elapsed, elapsed]
+            return
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total / count * 1000, 3),
+                "max_ms": round(longest * 1000, 3)
+            }
+            for name, (count, total, longest) in sorted(self.stats.items())
+        }
+
+    def reset(self):
+        self.stats.clear()
+
+class SamplingProfiler:
+    """Samples the event loop thread's stack from a side thread for a bounded window.
+
+    Nothing runs while it is stopped. Results are kept as folded stacks
+    ("outer;inner;leaf count"), the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float, max_duration: float):
+        self.interval = interval
+        self.max_duration = max_duration
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.ends_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float) -> float:
+        """Start sampling the calling thread; returns the effective duration"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        duration = min(max(duration, self.interval), self.max_duration)
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.ends_at = self.started_at + duration
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return duration
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.ends_at = time.time()
+
+    def _run(self, duration: float):
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        # Copy first, the sampling thread may still be adding stacks
+        stacks = sorted(dict(self.stacks).items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks),
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "ends_at": self.ends_at
+        }
+
+def instrument_engine(engine, prefix: str = "db"):
+    """Record a span per statement executed on an (async) engine, named by its verb"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["span_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("span_start", None)
+        if start is not None:
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement else "?"
+            spans.record(f"{prefix}.{verb}", time.perf_counter() - start)
+
+class TimingMiddleware:
+    """Timing span per HTTP route, written as plain ASGI.
+
+    It only wraps the downstream call, with no extra task or stream per
+    request, so a span covers the whole response, streamed bodies included.
+    """
+
+    def __init__(self, app, recorder: SpanRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The router stores the matched endpoint in the shared scope
+            endpoint = scope.get("endpoint")
+            self.recorder.record(
+                f"http.{endpoint.__name__ if endpoint else 'unmatched'}", time.perf_counter() - started
+            )
+
+spans = SpanRecorder()
+profiler = SamplingProfiler(settings.PROFILER_INTERVAL, settings.PROFILER_MAX_DURATION)
@@ -0,0 +1,186 @@
+import csv
+import json
+import logging
+from typing import IO, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.utils import generate_unique_quiz_codes
+from app.models.quiz import Quiz, Question
+from app.schemas.quiz import QuizCreate
+
+logger = logging.getLogger(__name__)
+
+# Flush a batch once it holds this many quizzes or questions
+IMPORT_BATCH_QUIZZES = 200
+IMPORT_BATCH_QUESTIONS = 2000
+
+# CSV layout: one row per question, consecutive rows with the same "quiz" key form one quiz
+CSV_COLUMNS = [
+    "quiz", "title", "description", "time_limit", "shuffle_questions", "delivery_mode",
+    "text", "options", "correct_answer", "score"
+]
+# Columns every CSV upload must have; the others may be left out
+CSV_REQUIRED_COLUMNS = ["title", "text", "options", "correct_answer"]
+
+class ImportParseError(ValueError):
+    """The upload cannot be read past `line`; items before it are still imported"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(message)
+        self.line = line
+
+def decoded_lines(fileobj: IO[bytes]) -> Iterator[str]:
+    """Upload lines as text, decoded one at a time so a bad byte is reported with its line"""
+    for line_no, line in enumerate(fileobj, start=1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ImportParseError(f"Line is not valid UTF-8: {str(e)}", line_no) from e
+
+def iter_ndjson(fileobj: IO[bytes]) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, parsed object) for each non-empty NDJSON line"""
+    for line_no, line in enumerate(decoded_lines(fileobj), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+def check_csv_header(fieldnames: Optional[List[str]]):
+    if not fieldnames:
+        raise ImportParseError("Empty CSV upload, expected a header row", 1)
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in fieldnames]
+    unknown = [column for column in fieldnames if column not in CSV_COLUMNS]
+    if missing or unknown:
+        problems = []
+        if missing:
+            problems.append(f"missing columns {missing}")
+        if unknown:
+            problems.append(f"unknown columns {unknown}")
+        raise ImportParseError(f"Invalid CSV header: {', '.join(problems)}; expected columns from {CSV_COLUMNS}", 1)
+
+def iter_csv(fileobj: IO[bytes]) -> Iterator[Tuple[int, object]]:
+    """Yield (line number of first row, quiz dict) by grouping question rows"""
+    # Lines keep their line endings, so quoted fields may still span lines
+    reader = csv.DictReader(decoded_lines(fileobj))
+    try:
+        yield from _group_csv_rows(reader)
+    except csv.Error as e:
+        raise ImportParseError(str(e), max(reader.line_num, 1)) from e
+
+def _group_csv_rows(reader: csv.DictReader) -> Iterator[Tuple[int, object]]:
+    check_csv_header(reader.fieldnames)
+    current_key = None
+    quiz = None
+    start_line = 0
+
+    for row in reader:
+        key = row.get("quiz") or row.get("title")
+        if key != current_key:
+            if quiz is not None:
+                yield start_line, quiz
+            current_key = key
+            start_line = reader.line_num
+            quiz = {
+                "title": row.get("title"),
+                "description": row.get("description") or None,
+                "settings": {
+                    "timeLimit": row.get("time_limit") or 0,
+                    "shuffleQuestions": (row.get("shuffle_questions") or "false").strip().lower() in ("1", "true", "yes"),
+                    "deliveryMode": (row.get("delivery_mode") or "bulk").strip().lower()
+                },
+                "questions": []
+            }
+        question = {
+            "text": row.get("text"),
+            "options": [option.strip() for option in (row.get("options") or "").split("|") if option.strip()],
+            "correctAnswer": row.get("correct_answer")
+        }
+        if row.get("score"):
+            question["score"] = row["score"]
+        quiz["questions"].append(question)
+
+    if quiz is not None:
+        yield start_line, quiz
+
+def next_batch(items: Iterator[Tuple[int, object]]) -> List[Tuple[int, object]]:
+    """Pull items until a batch is full (runs in a worker thread, reads the upload)"""
+    batch = []
+    questions = 0
+    for line_no, item in items:
+        batch.append((line_no, item))
+        if isinstance(item, dict):
+            questions += len(item.get("questions") or [])
+        if len(batch) >= IMPORT_BATCH_QUIZZES or questions >= IMPORT_BATCH_QUESTIONS:
+            break
+    return batch
+
+def validate_batch(batch, first_index: int) -> Tuple[list, list]:
+    """Split a parsed batch into (index, line, QuizCreate) entries and per-item errors"""
+    valid, errors = [], []
+    for offset, (line_no, item) in enumerate(batch):
+        index = first_index + offset
+        if isinstance(item, Exception):
+            errors.append({"item": index, "line": line_no, "errors": [{"field": "", "message": str(item)}]})
+            continue
+        try:
+            valid.append((index, line_no, QuizCreate.parse_obj(item)))
+        except ValidationError as e:
+            errors.append({
+                "item": index,
+                "line": line_no,
+                "errors": [
+                    {"field": ".".join(str(loc) for loc in err["loc"]), "message": err["msg"]}
+                    for err in e.errors()
+                ]
+            })
+    return valid, errors
+
+async def insert_batch(db: AsyncSession, valid: list, created_by_id: int) -> List[dict]:
+    """Insert a batch of quizzes and their questions in one transaction"""
+    try:
+        return await _insert_batch(db, valid, created_by_id)
+    except Exception as e:
+        # The caller rolls back and reports the batch's quizzes as failed
+        logger.error(f"Error importing batch of {len(valid)} quizzes: {str(e)}")
+        raise
+
+async def _insert_batch(db: AsyncSession, valid: list, created_by_id: int) -> List[dict]:
+    codes = await generate_unique_quiz_codes(db, len(valid))
+    await db.execute(Quiz.__table__.insert(), [
+        {
+            "code": code,
+            "title": quiz_data.title,
+            "description": quiz_data.description,
+            "created_by_id": created_by_id,
+            "settings": quiz_data.settings.dict()
+        }
+        for code, (_, _, quiz_data) in zip(codes, valid)
+    ])
+
+    # Multi-row inserts don't return every id, look them up by the unique codes
+    result = await db.execute(select(Quiz.code, Quiz.id).where(Quiz.code.in_(codes)))
+    quiz_ids = dict(result.all())
+
+    question_rows = [
+        {
+            "quiz_id": quiz_ids[code],
+            "text": q_data.text,
+            "options": q_data.options,
+            "correct_answer": q_data.correctAnswer,
+            "score": q_data.score,
+            "order": i
+        }
+        for code, (_, _, quiz_data) in zip(codes, valid)
+        for i, q_data in enumerate(quiz_data.questions)
+    ]
+    if question_rows:
+        await db.execute(Question.__table__.insert(), question_rows)
+    await db.commit()
+
+    return [
+        {"item": index, "id": quiz_ids[code], "code": code, "title": quiz_data.title}
+        for code, (index, _, quiz_data) in zip(codes, valid)
+    ]
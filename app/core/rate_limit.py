@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+
+class Overloaded(Exception):
+    """Raised when a room has too much database work in flight"""
+    pass
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse "type:rate:burst,..." into {type: (tokens per second, burst)}"""
+    limits = {}
+    for item in spec.split(","):
+        if item.strip():
+            message_type, rate, burst = item.strip().split(":")
+            rate, burst = float(rate), float(burst)
+            # A bucket that never refills or never holds a whole token would reject every message
+            if rate <= 0 or burst < 1:
+                raise ValueError(f"Invalid rate limit {item.strip()!r}: rate must be > 0 and burst >= 1")
+            limits[message_type] = (rate, burst)
+    return limits
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def wait(self) -> float:
+        """Return 0 if a token is available, else the seconds until one is; takes nothing"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Take the token wait() reported as available"""
+        self.tokens -= 1
+
+class ConnectionRateLimiter:
+    """Token buckets for one connection: one shared bucket plus one per limited message type"""
+    __slots__ = ("buckets",)
+
+    limits = parse_rate_limits(settings.WS_RATE_LIMITS)
+
+    def __init__(self):
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, key: str) -> Optional[TokenBucket]:
+        bucket = self.buckets.get(key)
+        if bucket is None and key in self.limits:
+            bucket = self.buckets[key] = TokenBucket(*self.limits[key])
+        return bucket
+
+    def check(self, message_type: str) -> float:
+        """Return 0 if the message is admitted, else the suggested retry delay.
+
+        Tokens are only taken once every bucket admits the message, so a
+        rejected message does not drain the shared bucket.
+        """
+        keys = ("default",) if message_type == "default" else ("default", message_type)
+        buckets = [bucket for bucket in map(self._bucket, keys) if bucket is not None]
+        retry_after = max((bucket.wait() for bucket in buckets), default=0.0)
+        if retry_after:
+            return retry_after
+        for bucket in buckets:
+            bucket.take()
+        return 0.0
+
+class RoomWorkLimiter:
+    """Caps the database work in flight per room.
+
+    Work beyond the cap waits up to `max_wait` seconds for a slot; if the
+    queue is already `max_queue` deep, or the wait times out, it is shed.
+    """
+
+    def __init__(self, limit: int, max_queue: int, max_wait: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        # quiz_code -> [semaphore, holders + waiters]
+        self._rooms: Dict[str, list] = {}
+        self.stats = {"admitted": 0, "deferred": 0, "shed": 0}
+
+    async def acquire(self, quiz_code: str):
+        entry = self._rooms.get(quiz_code)
+        if entry is None:
+            entry = self._rooms[quiz_code] = [asyncio.Semaphore(self.limit), 0]
+        semaphore = entry[0]
+
+        if semaphore.locked():
+            if entry[1] - self.limit >= self.max_queue:
+                self.stats["shed"] += 1
+                raise Overloaded(quiz_code)
+            self.stats["deferred"] += 1
+
+        entry[1] += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._leave(quiz_code, entry)
+            self.stats["shed"] += 1
+            raise Overloaded(quiz_code)
+        except BaseException:
+            self._leave(quiz_code, entry)
+            raise
+        self.stats["admitted"] += 1
+
+    def release(self, quiz_code: str):
+        entry = self._rooms.get(quiz_code)
+        if entry is not None:
+            entry[0].release()
+            self._leave(quiz_code, entry)
+
+    def _leave(self, quiz_code: str, entry: list):
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._rooms[quiz_code]
+
+room_work = RoomWorkLimiter(
+    settings.WS_ROOM_DB_CONCURRENCY,
+    settings.WS_ROOM_DB_QUEUE,
+    settings.WS_ROOM_DB_MAX_WAIT
+)
@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import List, Optional, Set
+from fastapi import WebSocket, WebSocketDisconnect
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only make sense for the original connection
+UNRECORDED_PARAMS = {"token", "resume", "last_seq"}
+
+class FrameRecorder:
+    """Opt-in capture of websocket traffic for replay.
+
+    Every text frame a recorded connection receives or sends is appended to
+    `path` as one NDJSON line with a time.monotonic() offset from the start
+    of the recording. Lines are buffered in memory and written by a
+    background task, so the socket path never waits on the disk.
+    Replay a recording with benchmarks/replay_session.py.
+    """
+
+    def __init__(self, path: str, rooms: str, flush_interval: float):
+        self.path = path
+        # Room codes to record, empty for every room
+        self.rooms: Set[str] = {code.strip() for code in rooms.split(",") if code.strip()}
+        self.flush_interval = flush_interval
+        self.started = time.monotonic()
+        self._ids = itertools.count(1)
+        self._buffer: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def wrap(self, websocket: WebSocket, quiz_code: str, email: str) -> WebSocket:
+        """Return a recording proxy for the socket, or the socket itself when it is not recorded"""
+        if not self.enabled or (self.rooms and quiz_code not in self.rooms):
+            return websocket
+        conn = next(self._ids)
+        self.record(conn, "open", quiz=quiz_code, user=email, params={
+            key: value for key, value in websocket.query_params.items() if key not in UNRECORDED_PARAMS
+        })
+        return RecordedWebSocket(websocket, self, conn)
+
+    def record(self, conn: int, direction: str, **fields):
+        line = {"t": round(time.monotonic() - self.started, 6), "conn": conn, "dir": direction}
+        line.update(fields)
+        self._buffer.append(json.dumps(line, separators=(",", ":"), ensure_ascii=False))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _write(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self):
+        lines, self._buffer = self._buffer, []
+        if lines:
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except Exception as e:
+                logger.error(f"Error writing frame recording: {str(e)}")
+
+    async def _run(self):
+        while self._buffer:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+class RecordedWebSocket:
+    """Forwards to a real socket and records the text frames passing through"""
+    __slots__ = ("websocket", "recorder", "conn")
+
+    def __init__(self, websocket: WebSocket, recorder: FrameRecorder, conn: int):
+        self.websocket = websocket
+        self.recorder = recorder
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.websocket, name)
+
+    async def receive(self) -> dict:
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            self.recorder.record(self.conn, "close", code=message.get("code", 1000))
+        elif message.get("text") is not None:
+            self.recorder.record(self.conn, "in", frame=message["text"])
+        return message
+
+    async def receive_text(self) -> str:
+        try:
+            text = await self.websocket.receive_text()
+        except WebSocketDisconnect as e:
+            self.recorder.record(self.conn, "close", code=e.code)
+            raise
+        self.recorder.record(self.conn, "in", frame=text)
+        return text
+
+    async def send_text(self, data: str):
+        self.recorder.record(self.conn, "out", frame=data)
+        await self.websocket.send_text(data)
+
+    async def send_json(self, data, mode: str = "text"):
+        # Same encoding Starlette uses, so the recorded frame is what went on the wire
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        self.recorder.record(self.conn, "close", code=code, by="server")
+        await self.websocket.close(code=code, reason=reason)
+
+frame_recorder = FrameRecorder(
+    settings.WS_RECORD_PATH,
+    settings.WS_RECORD_ROOMS,
+    settings.WS_RECORD_FLUSH_INTERVAL
+)
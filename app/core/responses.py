@@ -0,0 +1,118 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+from fastapi.responses import Response
+from app.core.config import settings
+from app.schemas.quiz import Quiz as QuizSchema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(Response):
+    """JSON response encoded in a single pass.
+
+    Returning a Response from a route makes FastAPI skip `response_model`
+    validation and `jsonable_encoder`, so routes using this are responsible
+    for producing payloads that match their declared schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+def serialize_quiz(quiz_row, creator_email: Optional[str], questions) -> dict:
+    """Build the Quiz schema payload from ORM objects or column rows.
+
+    `quiz_row` needs id, code, created_at, created_by_id, title, description,
+    status and settings; each question needs id, text, options,
+    correct_answer and score, already in display order.
+    """
+    payload = {
+        "id": quiz_row.id,
+        "code": quiz_row.code,
+        "createdAt": quiz_row.created_at,
+        "createdBy": {
+            "id": str(quiz_row.created_by_id),
+            "email": creator_email
+        },
+        "title": quiz_row.title,
+        "description": quiz_row.description,
+        "status": quiz_row.status,
+        "questions": [
+            {
+                "id": q.id,
+                "text": q.text,
+                "options": q.options,
+                "correctAnswer": q.correct_answer,
+                "score": q.score
+            }
+            for q in questions
+        ],
+        "settings": quiz_row.settings
+    }
+    if settings.VALIDATE_RESPONSES:
+        # Validate once against the declared schema (disable in production)
+        QuizSchema.parse_obj(payload)
+    return payload
+
+class ResponseCache:
+    """Small LRU of encoded response bodies.
+
+    Take version() before reading the data a body is built from and pass it
+    to set(): a body whose key was invalidated in between is not cached, so a
+    read that raced an invalidation cannot put the old body back.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._version = 0
+        # key -> version of its last invalidation, for the max_size most recent keys
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        # Versions below this may have lost the record of a later invalidation
+        self._floor = 0
+
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, body: bytes, version: int):
+        if version < self._floor or self._invalidated.get(key, 0) > version:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+        self._version += 1
+        self._invalidated[key] = self._version
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > self.max_size:
+            _, version = self._invalidated.popitem(last=False)
+            self._floor = version
+
+# quiz code -> encoded get_quiz_by_code body; invalidated when the quiz status changes
+quiz_response_cache = ResponseCache(settings.QUIZ_RESPONSE_CACHE_SIZE)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import math
+from typing import Callable, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TimerHandle:
+    """A scheduled callback; cancel() is O(1) and the entry is dropped lazily"""
+    __slots__ = ("callback", "args", "rounds", "cancelled")
+
+    def __init__(self, callback: Callable, args: tuple, rounds: int):
+        self.callback = callback
+        self.args = args
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerWheel:
+    """Hashed timer wheel driven by a single asyncio task.
+
+    Timers are hashed into `slots` buckets by expiry tick. Each tick only the
+    current bucket is visited, so the cost per tick depends on the timers due
+    now rather than on the total number scheduled. Callbacks run synchronously
+    on the event loop and should schedule tasks for any async work.
+    """
+
+    def __init__(self, tick: float, slots: int):
+        self.tick = tick
+        self.wheel: List[List[TimerHandle]] = [[] for _ in range(slots)]
+        self.position = 0
+        self.pending = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """Run callback(*args) after roughly `delay` seconds (rounded up to the tick)"""
+        ticks = max(1, math.ceil(delay / self.tick))
+        n_slots = len(self.wheel)
+        handle = TimerHandle(callback, args, (ticks - 1) // n_slots)
+        self.wheel[(self.position + ticks) % n_slots].append(handle)
+        self.pending += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return handle
+
+    def _advance(self):
+        self.position = (self.position + 1) % len(self.wheel)
+        if not self.wheel[self.position]:
+            return
+        # Take the bucket out first: a callback that reschedules a whole number of
+        # rotations ahead appends to this slot, and must land in the fresh list
+        bucket, self.wheel[self.position] = self.wheel[self.position], []
+        remaining = []
+        for handle in bucket:
+            if handle.cancelled:
+                self.pending -= 1
+            elif handle.rounds:
+                handle.rounds -= 1
+                remaining.append(handle)
+            else:
+                self.pending -= 1
+                try:
+                    handle.callback(*handle.args)
+                except Exception as e:
+                    logger.error(f"Error in timer callback: {str(e)}")
+        self.wheel[self.position].extend(remaining)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        # Stop when nothing is scheduled; call_later restarts the task
+        while self.pending:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on any ticks missed while the loop was busy
+            while loop.time() >= next_tick:
+                self._advance()
+                next_tick += self.tick
+
+timer_wheel = TimerWheel(settings.TIMER_WHEEL_TICK, settings.TIMER_WHEEL_SLOTS)
@@ -1,19 +1,32 @@
 import random
 import string
+from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.quiz import Quiz
 
+def random_quiz_code() -> str:
+    """Random 6-character code: 3 letters followed by 3 numbers"""
+    letters = ''.join(random.choices(string.ascii_uppercase, k=3))
+    numbers = ''.join(random.choices(string.digits, k=3))
+    return f"{letters}{numbers}"
+
 async def generate_unique_quiz_code(db: AsyncSession) -> str:
     """Generate a unique 6-character code for a quiz."""
     while True:
-        # Generate a random 6-character code (3 letters followed by 3 numbers)
-        letters = ''.join(random.choices(string.ascii_uppercase, k=3))
-        numbers = ''.join(random.choices(string.digits, k=3))
-        code = f"{letters}{numbers}"
+        code = random_quiz_code()
         
         # Check if code exists using SQLAlchemy's select
         stmt = select(Quiz).where(Quiz.code == code)
         result = await db.execute(stmt)
         if not result.scalar_one_or_none():
             return code
+
+async def generate_unique_quiz_codes(db: AsyncSession, count: int) -> List[str]:
+    """Generate `count` unique quiz codes, checking each round of candidates in one query."""
+    codes = set()
+    while len(codes) < count:
+        candidates = {random_quiz_code() for _ in range(count - len(codes))} - codes
+        result = await db.execute(select(Quiz.code).where(Quiz.code.in_(candidates)))
+        codes |= candidates - set(result.scalars().all())
+    return list(codes)
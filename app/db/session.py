@@ -1,13 +1,107 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.profiling import instrument_engine
 
 engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=True)
+
+# Embedded mode: WAL lets readers run alongside the single writer
+SQLITE_PRAGMAS = [
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "foreign_keys=ON",
+    f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+    "temp_store=MEMORY",
+    "cache_size=-65536",  # 64 MiB
+    "mmap_size=268435456",
+]
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+def configure_sqlite(async_engine):
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+configure_sqlite(engine)
+
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Optional read replica; without one, reads go to the primary
+if settings.READ_DATABASE_URL:
+    read_engine = create_async_engine(settings.READ_DATABASE_URL, echo=True)
+    configure_sqlite(read_engine)
+else:
+    read_engine = engine
+AsyncReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Per-statement timing spans
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine, "db_read")
+
+# Read-your-writes: key (quiz id or quiz code) -> time.monotonic() until which reads use the primary.
+# Kept in deadline order (the window is fixed), so expired keys are dropped from the front
+recent_writes: "OrderedDict[Hashable, float]" = OrderedDict()
+
+def mark_write(*keys: Hashable):
+    """Record a write so reads for these keys stay on the primary while the replica catches up"""
+    if read_engine is engine:
+        return
+    now = time.monotonic()
+    # Keys that are written and never read again would otherwise stay forever
+    while recent_writes:
+        key, until = next(iter(recent_writes.items()))
+        if until > now:
+            break
+        del recent_writes[key]
+    until = now + settings.REPLICA_LAG_WINDOW
+    for key in keys:
+        recent_writes[key] = until
+        recent_writes.move_to_end(key)
+
+def read_session_for(key: Hashable) -> sessionmaker:
+    """Session factory for reading data about `key`"""
+    until = recent_writes.get(key)
+    if until is not None:
+        if time.monotonic() < until:
+            return AsyncSessionLocal
+        del recent_writes[key]
+    return AsyncReadSessionLocal
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+async def get_read_db():
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_quiz_read_db(quiz_id: int):
+    """Read session for routes with a quiz_id path parameter"""
+    async with read_session_for(quiz_id)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_quiz_code_read_db(quiz_code: str):
+    """Read session for routes with a quiz_code path parameter"""
+    async with read_session_for(quiz_code)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Boolean
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class QuizAnswer(Base):
+    """Append-only log of every answer submitted in a quiz"""
+    __tablename__ = "quiz_answers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_id = Column(Integer, ForeignKey("quiz_sessions.id", ondelete="SET NULL"), index=True)  # NULL outside a run
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    answer = Column(Integer, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    score = Column(Float, default=0, nullable=False)  # Points awarded for this answer
+    answered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class QuizSession(Base):
+    """One run of a quiz, from start_quiz to end_quiz"""
+    __tablename__ = "quiz_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    ended_at = Column(DateTime(timezone=True))  # NULL while the session is running
+    participant_count = Column(Integer, default=0, nullable=False)
+
+class QuizSessionScore(Base):
+    """Final score and rank of one participant in an ended session"""
+    __tablename__ = "quiz_session_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("quiz_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, default=0, nullable=False)
+    rank = Column(Integer, nullable=False)  # 1 = best; ties share a rank
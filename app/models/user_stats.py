@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from app.db.base_class import Base
+
+class UserStats(Base):
+    """Per-user aggregates, updated incrementally whenever a session ends"""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sessions_played = Column(Integer, default=0, nullable=False)
+    total_score = Column(Float, default=0, nullable=False)
+    best_score = Column(Float, default=0, nullable=False)
+    best_rank = Column(Integer)
+    last_played_at = Column(DateTime(timezone=True))
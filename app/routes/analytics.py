@@ -0,0 +1,88 @@
+from itertools import chain
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+import numpy as np
+from app.db.session import read_session_for
+from app.core.security import get_current_user, is_admin
+from app.core.analytics import compute_quiz_analytics
+from app.core.answer_log import answer_log
+from app.models.quiz import Quiz, Question
+from app.models.quiz_answer import QuizAnswer
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/quizzes/{quiz_id}/analytics")
+async def get_quiz_analytics(
+    quiz_id: int,
+    session_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Per-question correctness, option distribution and per-user accuracy for a quiz.
+
+    Covers every run of the quiz unless `session_id` picks one; answers
+    logged before runs were tracked have no session and only count then.
+    Only the quiz's creator and admins may read it.
+    """
+    # Make sure answers still sitting in the write buffer are included; the
+    # flush marks the quiz as written, so the session below reads the primary
+    await answer_log.flush()
+
+    async with read_session_for(quiz_id)() as db:
+        result = await db.execute(select(Quiz.created_by_id).where(Quiz.id == quiz_id))
+        quiz = result.one_or_none()
+        if quiz is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        if quiz.created_by_id != current_user.id and not is_admin(current_user.email):
+            raise HTTPException(status_code=403, detail="Not allowed to read other users' quiz analytics")
+
+        result = await db.execute(
+            select(Question.id, Question.text, Question.options)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Question.order)
+        )
+        questions = result.all()
+
+        query = (
+            select(
+                QuizAnswer.question_id,
+                QuizAnswer.user_id,
+                QuizAnswer.answer,
+                QuizAnswer.is_correct
+            )
+            .where(QuizAnswer.quiz_id == quiz_id)
+        )
+        if session_id is not None:
+            query = query.where(QuizAnswer.session_id == session_id)
+        rows = (await db.execute(query)).all()
+        # Flatten the rows' values straight into the array; np.array over Row objects
+        # inspects every row as a sequence and dominates the request at 100k answers
+        answers = np.fromiter(
+            chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 4
+        ).reshape(-1, 4)
+
+        question_stats, user_stats = compute_quiz_analytics(
+            answers,
+            [q.id for q in questions],
+            [len(q.options) for q in questions]
+        )
+        for stats, q in zip(question_stats, questions):
+            stats["text"] = q.text
+
+        # Resolve emails in a single query
+        if user_stats:
+            result = await db.execute(
+                select(User.id, User.email).where(User.id.in_([u["user_id"] for u in user_stats]))
+            )
+            emails = dict(result.all())
+            for stats in user_stats:
+                stats["email"] = emails.get(stats["user_id"])
+
+    return {
+        "quiz_id": quiz_id,
+        "session_id": session_id,
+        "total_answers": len(answers),
+        "questions": question_stats,
+        "users": user_stats
+    }
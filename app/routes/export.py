@@ -0,0 +1,180 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from datetime import datetime
+from typing import List, Optional
+import csv
+import io
+import json
+from app.db.session import AsyncReadSessionLocal
+from app.core.security import get_current_user, is_admin
+from app.models.quiz import Quiz
+from app.models.quiz_answer import QuizAnswer
+from app.models.quiz_connection import QuizConnection
+from app.models.quiz_score import QuizParticipantScore
+from app.models.quiz_session import QuizSession, QuizSessionScore
+from app.models.user import User
+
+router = APIRouter()
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 1000
+
+COLUMNS = [
+    "kind", "quiz_id", "quiz_code", "user_id", "email",
+    "question_id", "answer", "is_correct", "score", "timestamp",
+    "session_id", "rank"
+]
+
+EXPORT_KINDS = {"scores", "participants", "answers"}
+
+def build_export_queries(kinds, quiz_ids, created_by, since, until):
+    """One select per record kind, all yielding rows in COLUMNS order"""
+    queries = []
+
+    def filtered(stmt, timestamp_column):
+        if quiz_ids:
+            stmt = stmt.where(Quiz.id.in_(quiz_ids))
+        if created_by is not None:
+            stmt = stmt.where(Quiz.created_by_id == created_by)
+        if since is not None:
+            stmt = stmt.where(timestamp_column >= since)
+        if until is not None:
+            stmt = stmt.where(timestamp_column < until)
+        return stmt
+
+    if "scores" in kinds:
+        queries.append(("scores", filtered(
+            select(
+                Quiz.id, Quiz.code, User.id, User.email,
+                QuizParticipantScore.score, QuizParticipantScore.created_at
+            )
+            .select_from(QuizParticipantScore)
+            .join(Quiz, Quiz.id == QuizParticipantScore.quiz_id)
+            .join(User, User.id == QuizParticipantScore.user_id)
+            .order_by(QuizParticipantScore.id),
+            QuizParticipantScore.created_at
+        )))
+        # Ended runs: end_quiz archives the final scores and clears the live ones
+        queries.append(("session_scores", filtered(
+            select(
+                Quiz.id, Quiz.code, User.id, User.email, QuizSessionScore.score,
+                QuizSession.ended_at, QuizSessionScore.session_id, QuizSessionScore.rank
+            )
+            .select_from(QuizSessionScore)
+            .join(QuizSession, QuizSession.id == QuizSessionScore.session_id)
+            .join(Quiz, Quiz.id == QuizSessionScore.quiz_id)
+            .join(User, User.id == QuizSessionScore.user_id)
+            .order_by(QuizSessionScore.id),
+            QuizSession.ended_at
+        )))
+    if "participants" in kinds:
+        queries.append(("participants", filtered(
+            select(Quiz.id, Quiz.code, User.id, User.email, QuizConnection.connected_at)
+            .select_from(QuizConnection)
+            .join(Quiz, Quiz.id == QuizConnection.quiz_id)
+            .join(User, User.id == QuizConnection.user_id)
+            .order_by(QuizConnection.id),
+            QuizConnection.connected_at
+        )))
+    if "answers" in kinds:
+        queries.append(("answers", filtered(
+            select(
+                Quiz.id, Quiz.code, User.id, User.email, QuizAnswer.question_id,
+                QuizAnswer.answer, QuizAnswer.is_correct, QuizAnswer.score, QuizAnswer.answered_at,
+                QuizAnswer.session_id
+            )
+            .select_from(QuizAnswer)
+            .join(Quiz, Quiz.id == QuizAnswer.quiz_id)
+            .join(User, User.id == QuizAnswer.user_id)
+            .order_by(QuizAnswer.id),
+            QuizAnswer.answered_at
+        )))
+    return queries
+
+def to_record(kind: str, row) -> list:
+    """Map a query row onto COLUMNS"""
+    if kind == "scores":
+        # Live scores of a running quiz, not yet tied to an ended session
+        quiz_id, code, user_id, email, score, timestamp = row
+        return [kind, quiz_id, code, user_id, email, None, None, None, score, timestamp, None, None]
+    if kind == "session_scores":
+        quiz_id, code, user_id, email, score, timestamp, session_id, rank = row
+        return ["scores", quiz_id, code, user_id, email, None, None, None, score, timestamp, session_id, rank]
+    if kind == "participants":
+        quiz_id, code, user_id, email, timestamp = row
+        return [kind, quiz_id, code, user_id, email, None, None, None, None, timestamp, None, None]
+    quiz_id, code, user_id, email, question_id, answer, is_correct, score, timestamp, session_id = row
+    return [
+        kind, quiz_id, code, user_id, email, question_id, answer, bool(is_correct), score, timestamp,
+        session_id, None
+    ]
+
+def encode_ndjson(records: List[list]) -> bytes:
+    lines = [
+        json.dumps(dict(zip(COLUMNS, record)), default=str, separators=(",", ":"))
+        for record in records
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+def encode_csv(records: List[list]) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in record]
+        for record in records
+    )
+    return out.getvalue().encode()
+
+async def stream_export(queries, fmt: str):
+    """Yield encoded chunks straight from server-side cursors"""
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    if fmt == "csv":
+        yield encode_csv([COLUMNS])
+
+    async with AsyncReadSessionLocal() as db:
+        for kind, stmt in queries:
+            result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+            async for rows in result.partitions():
+                yield encode([to_record(kind, row) for row in rows])
+
+@router.get("/export/results")
+async def export_results(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    quiz_id: Optional[List[int]] = Query(None),
+    created_by: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include: str = "scores,participants,answers",
+    current_user: User = Depends(get_current_user)
+):
+    """Stream scores, participants and answers as NDJSON or CSV.
+
+    Scores cover the live scores of running quizzes and the final scores of
+    ended sessions. Admins may export any quiz; other users only the quizzes
+    they created.
+    """
+    if not is_admin(current_user.email):
+        if created_by is not None and created_by != current_user.id:
+            raise HTTPException(status_code=403, detail="Not allowed to export other users' quizzes")
+        created_by = current_user.id
+
+    kinds = {kind.strip() for kind in include.split(",") if kind.strip()}
+    unknown = kinds - EXPORT_KINDS
+    if unknown or not kinds:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "ValidationError",
+                "message": "Invalid export kinds",
+                "details": [{"field": "include", "message": f"Expected any of {sorted(EXPORT_KINDS)}"}]
+            }
+        )
+
+    queries = build_export_queries(kinds, quiz_id, created_by, since, until)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(queries, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=quiz_results.{format}"}
+    )
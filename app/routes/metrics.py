@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from app.core.security import get_current_user
+from app.core.answer_log import answer_log
+from app.core.heartbeat import heartbeat
+from app.core.rate_limit import room_work
+from app.websocket.admission import join_batcher
+from app.websocket.actor import actor_stats, room_actors
+from app.websocket.monitor import monitor_hub
+from app.websocket.spectators import spectator_fanout
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/metrics/websocket")
+async def get_websocket_metrics(current_user: User = Depends(get_current_user)):
+    """Heartbeat and admission control counters for websocket connections."""
+    return {
+        "tracked_connections": len(heartbeat.last_seen),
+        "heartbeat": dict(heartbeat.stats),
+        "room_db_work": dict(room_work.stats),
+        "join_batches": dict(join_batcher.stats),
+        "spectators": spectator_fanout.count(),
+        "spectator_fanout": dict(spectator_fanout.stats),
+        "room_actors": len(room_actors),
+        "room_actor_mailbox": sum(len(actor.mailbox) for actor in room_actors.values()),
+        "room_actor_stats": dict(actor_stats),
+        "monitors": len(monitor_hub.connections),
+        "monitor_subscriptions": sum(len(subscribers) for subscribers in monitor_hub.subscribers.values()),
+        "monitor_hub": dict(monitor_hub.stats),
+        "answer_log": dict(answer_log.stats)
+    }
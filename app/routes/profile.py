@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from typing import Optional
+from app.db.session import read_session_for
+from app.core.security import get_current_user
+from app.models.quiz import Quiz
+from app.models.quiz_session import QuizSession, QuizSessionScore
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.schemas.profile import UserStatsOut, SessionHistory
+
+router = APIRouter()
+
+@router.get("/users/me/stats", response_model=UserStatsOut)
+async def get_my_stats(current_user: User = Depends(get_current_user)):
+    """Aggregates maintained when sessions end, so this is a single primary-key read"""
+    async with read_session_for(("user", current_user.id))() as db:
+        result = await db.execute(select(UserStats).where(UserStats.user_id == current_user.id))
+        stats = result.scalar_one_or_none()
+
+    if stats is None:
+        return UserStatsOut(sessions_played=0, total_score=0, average_score=0, best_score=0)
+    return UserStatsOut(
+        sessions_played=stats.sessions_played,
+        total_score=stats.total_score,
+        average_score=stats.total_score / stats.sessions_played if stats.sessions_played else 0,
+        best_score=stats.best_score,
+        best_rank=stats.best_rank,
+        last_played_at=stats.last_played_at
+    )
+
+@router.get("/users/me/history", response_model=SessionHistory)
+async def get_my_history(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Ended sessions, newest first, paged by keyset on the archived score id"""
+    query = (
+        select(
+            QuizSessionScore.id,
+            QuizSessionScore.session_id,
+            QuizSessionScore.quiz_id,
+            Quiz.code,
+            Quiz.title,
+            QuizSessionScore.score,
+            QuizSessionScore.rank,
+            QuizSession.participant_count,
+            QuizSession.started_at,
+            QuizSession.ended_at
+        )
+        .select_from(QuizSessionScore)
+        .join(QuizSession, QuizSession.id == QuizSessionScore.session_id)
+        .join(Quiz, Quiz.id == QuizSessionScore.quiz_id)
+        .where(QuizSessionScore.user_id == current_user.id)
+        .order_by(QuizSessionScore.id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        query = query.where(QuizSessionScore.id < before)
+
+    async with read_session_for(("user", current_user.id))() as db:
+        result = await db.execute(query)
+        rows = result.all()
+
+    return {
+        "sessions": [
+            {
+                "session_id": row.session_id,
+                "quiz_id": row.quiz_id,
+                "quiz_code": row.code,
+                "quiz_title": row.title,
+                "score": row.score,
+                "rank": row.rank,
+                "participant_count": row.participant_count,
+                "started_at": row.started_at,
+                "ended_at": row.ended_at
+            }
+            for row in rows
+        ],
+        "next_before": rows[-1].id if len(rows) == limit else None
+    }
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.core.security import get_current_admin
+from app.core.profiling import profiler, spans
+from app.models.user import User
+
+router = APIRouter()
+
+@router.post("/admin/profiler/start")
+async def start_profiler(
+    duration: float = Query(10, gt=0),
+    current_user: User = Depends(get_current_admin)
+):
+    """Sample the event loop for `duration` seconds (capped by PROFILER_MAX_DURATION)"""
+    if profiler.running:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": "Conflict",
+                "message": "Profiler is already running",
+                "details": [{"field": "duration", "message": "Stop the current run first"}]
+            }
+        )
+    # Route handlers run on the event loop thread, which is the one sampled
+    profiler.start(duration)
+    return profiler.status()
+
+@router.post("/admin/profiler/stop")
+async def stop_profiler(current_user: User = Depends(get_current_admin)):
+    profiler.stop()
+    return profiler.status()
+
+@router.get("/admin/profiler")
+async def get_profiler_status(current_user: User = Depends(get_current_admin)):
+    return profiler.status()
+
+@router.get("/admin/profiler/flamegraph", response_class=PlainTextResponse)
+async def download_flamegraph(current_user: User = Depends(get_current_admin)):
+    """Folded stacks of the last run, for flamegraph.pl or speedscope"""
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'}
+    )
+
+@router.get("/admin/spans")
+async def get_spans(current_user: User = Depends(get_current_admin)):
+    return spans.summary()
+
+@router.delete("/admin/spans")
+async def reset_spans(current_user: User = Depends(get_current_admin)):
+    spans.reset()
+    return {"status": "reset"}
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from app.db.session import get_db
+from app.db.session import get_db, get_quiz_read_db, get_quiz_code_read_db, mark_write
 from app.core.security import get_current_user
 from app.core.utils import generate_unique_quiz_code
+from app.core.quiz_import import ImportParseError, iter_csv, iter_ndjson, next_batch, validate_batch, insert_batch
+from app.core.responses import FastJSONResponse, serialize_quiz, quiz_response_cache, dumps
 from app.schemas.quiz import QuizCreate, Quiz as QuizSchema
 from app.schemas.quiz_connection import QuizParticipantList
 from app.models.quiz import Quiz, Question
 from app.models.quiz_connection import QuizConnection
 from app.models.user import User
-from typing import List
-import json
+from typing import Optional
 
 router = APIRouter()
 
@@ -38,6 +39,7 @@ async def create_quiz(
         await db.flush()  # Flush to get the quiz ID
         
         # Create questions
+        questions = []
         for i, q_data in enumerate(quiz_data.questions):
             question = Question(
                 quiz_id=quiz.id,  # Use quiz.id directly
@@ -48,38 +50,14 @@ async def create_quiz(
                 order=i
             )
             db.add(question)
+            questions.append(question)
         
         await db.commit()
+        # The creator usually opens the new quiz right away, before the replica has it
+        mark_write(quiz.id, quiz_code)
         
-        # Get the quiz with questions using eager loading
-        stmt = select(Quiz).options(selectinload(Quiz.questions)).where(Quiz.id == quiz.id)
-        result = await db.execute(stmt)
-        quiz = result.scalar_one()
-        
-        # Format response
-        return {
-            "id": quiz.id,
-            "code": quiz.code,
-            "createdAt": quiz.created_at,
-            "createdBy": {
-                "id": current_user.id,
-                "email": current_user.email
-            },
-            "title": quiz.title,
-            "description": quiz.description,
-            "status": quiz.status,
-            "questions": [
-                {
-                    "id": q.id,
-                    "text": q.text,
-                    "options": q.options,
-                    "correctAnswer": q.correct_answer,
-                    "score": q.score
-                }
-                for q in sorted(quiz.questions, key=lambda x: x.order)
-            ],
-            "settings": quiz.settings
-        }
+        # Format response straight from the objects we just wrote (not expired on commit)
+        return FastJSONResponse(serialize_quiz(quiz, current_user.email, questions))
         
     except Exception as e:
         await db.rollback()
@@ -92,6 +70,55 @@ async def create_quiz(
             }
         )
 
+@router.post("/quizzes/import")
+async def import_quizzes(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, regex="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk-create quizzes from an NDJSON (one QuizCreate per line) or CSV (one question per row) upload."""
+    fmt = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    items = iter_csv(file.file) if fmt == "csv" else iter_ndjson(file.file)
+
+    imported = []
+    errors = []
+    index = 0
+    while True:
+        # Parse the next batch off the event loop, the upload may be spooled to disk
+        try:
+            batch = await run_in_threadpool(next_batch, items)
+        except ImportParseError as e:
+            errors.append({"item": index, "line": e.line, "errors": [{"field": "", "message": str(e)}]})
+            break
+        if not batch:
+            break
+
+        valid, batch_errors = validate_batch(batch, index)
+        index += len(batch)
+        errors.extend(batch_errors)
+        if not valid:
+            continue
+
+        try:
+            created = await insert_batch(db, valid, current_user.id)
+        except Exception as e:
+            await db.rollback()
+            errors.extend(
+                {"item": item_index, "line": line_no, "errors": [{"field": "", "message": str(e)}]}
+                for item_index, line_no, _ in valid
+            )
+            continue
+        imported.extend(created)
+        mark_write(*(quiz["id"] for quiz in created), *(quiz["code"] for quiz in created))
+
+    return {
+        "imported": len(imported),
+        "failed": len(errors),
+        "quizzes": imported,
+        "errors": errors
+    }
+
 # @router.get("/quizzes/{quiz_id}", response_model=QuizSchema)
 # async def get_quiz(
 #     quiz_id: int,
@@ -159,17 +186,27 @@ async def create_quiz(
 async def get_quiz_by_code(
     quiz_code: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_quiz_code_read_db)
 ):
     """Get quiz details by code."""
     try:
-        # Get quiz with questions
-        stmt = select(Quiz).options(
-            selectinload(Quiz.questions),
-            selectinload(Quiz.created_by)
-        ).where(Quiz.code == quiz_code)
-        result = await db.execute(stmt)
-        quiz = result.scalar_one_or_none()
+        # Serve the encoded body if nothing changed since it was built
+        version = quiz_response_cache.version()
+        body = quiz_response_cache.get(quiz_code)
+        if body is not None:
+            return FastJSONResponse(body)
+
+        # Get quiz and creator as plain column rows
+        result = await db.execute(
+            select(
+                Quiz.id, Quiz.code, Quiz.created_at, Quiz.created_by_id,
+                Quiz.title, Quiz.description, Quiz.status, Quiz.settings,
+                User.email
+            )
+            .outerjoin(User, User.id == Quiz.created_by_id)
+            .where(Quiz.code == quiz_code)
+        )
+        quiz = result.one_or_none()
         
         if not quiz:
             raise HTTPException(
@@ -180,31 +217,18 @@ async def get_quiz_by_code(
                     "details": [{"field": "quiz_code", "message": f"Quiz with code {quiz_code} does not exist"}]
                 }
             )
+
+        # Get questions in display order
+        result = await db.execute(
+            select(Question.id, Question.text, Question.options, Question.correct_answer, Question.score)
+            .where(Question.quiz_id == quiz.id)
+            .order_by(Question.order)
+        )
         
         # Format response
-        return {
-            "id": quiz.id,
-            "code": quiz.code,
-            "createdAt": quiz.created_at,
-            "createdBy": {
-                "id": quiz.created_by.id,
-                "email": quiz.created_by.email
-            },
-            "title": quiz.title,
-            "description": quiz.description,
-            "status": quiz.status,
-            "questions": [
-                {
-                    "id": q.id,
-                    "text": q.text,
-                    "options": q.options,
-                    "correctAnswer": q.correct_answer,
-                    "score": q.score
-                }
-                for q in sorted(quiz.questions, key=lambda x: x.order)
-            ],
-            "settings": quiz.settings
-        }
+        body = dumps(serialize_quiz(quiz, quiz.email, result.all()))
+        quiz_response_cache.set(quiz_code, body, version)
+        return FastJSONResponse(body)
         
     except Exception as e:
         if isinstance(e, HTTPException):
@@ -222,7 +246,7 @@ async def get_quiz_by_code(
 async def get_quiz_participants(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_quiz_read_db)
 ):
     """Get all participants of a quiz."""
     # Check if quiz exists
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class UserStatsOut(BaseModel):
+    sessions_played: int
+    total_score: float
+    average_score: float
+    best_score: float
+    best_rank: Optional[int] = None
+    last_played_at: Optional[datetime] = None
+
+class SessionHistoryEntry(BaseModel):
+    session_id: int
+    quiz_id: int
+    quiz_code: str
+    quiz_title: str
+    score: float
+    rank: int
+    participant_count: int
+    started_at: datetime
+    ended_at: Optional[datetime] = None
+
+class SessionHistory(BaseModel):
+    sessions: List[SessionHistoryEntry]
+    # Pass as `before` to get the next (older) page
+    next_before: Optional[int] = None
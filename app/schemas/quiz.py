@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import datetime
 
 class QuestionBase(BaseModel):
@@ -20,6 +20,8 @@ class Question(QuestionBase):
 class QuizSettings(BaseModel):
     timeLimit: int
     shuffleQuestions: bool
+    # "bulk" sends every question in start_quiz_now, "progressive" sends each one as it becomes active
+    deliveryMode: Literal["bulk", "progressive"] = "bulk"
 
 class QuizBase(BaseModel):
     title: str
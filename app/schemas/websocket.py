@@ -0,0 +1,20 @@
+from pydantic import BaseModel, conlist
+from app.core.config import settings
+
+# Client -> server websocket messages; the "type" field selects the model
+
+class EmptyMessage(BaseModel):
+    """Messages that carry nothing besides their type"""
+    pass
+
+class SubmitAnswer(BaseModel):
+    question_id: int
+    answer: int
+
+class SubmitAnswers(BaseModel):
+    """Many answers graded together, e.g. flushed by a client that was offline"""
+    answers: conlist(SubmitAnswer, min_items=1, max_items=settings.WS_ANSWER_BATCH_MAX)
+
+class MonitorRooms(BaseModel):
+    """subscribe / unsubscribe on the monitor socket"""
+    rooms: conlist(str, min_items=1, max_items=settings.WS_MONITOR_MAX_ROOMS)
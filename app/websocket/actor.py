@@ -0,0 +1,180 @@
+import asyncio
+import inspect
+import json
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import WebSocket
+from app.core.config import settings
+from app.core.profiling import spans
+from app.websocket.monitor import monitor_hub
+from app.websocket.rooms import rooms
+from app.websocket.sessions import get_replay_buffer, room_sessions
+from app.websocket.shuffle import shuffles
+from app.websocket.spectators import spectator_fanout
+
+logger = logging.getLogger(__name__)
+
+class RoomActor:
+    """Single owner of a room's sockets and lifecycle.
+
+    Joins, leaves, broadcasts and start/next/end all go through the
+    mailbox and run one at a time on the actor's task, so none of them can
+    interleave at an await: a broadcast never sees the member set change
+    halfway, frames reach every socket in sequence order, and two hosts
+    pressing start together run one start after the other. The task only
+    exists while commands are waiting.
+
+    Every send on the actor is bounded by WS_SEND_TIMEOUT. A member whose
+    send fails or times out is dropped and closed off the actor's task, so
+    one half-open socket costs the room one timeout, not every later frame.
+    """
+
+    def __init__(self, quiz_code: str):
+        self.quiz_code = quiz_code
+        # socket -> user id
+        self.members: Dict[WebSocket, int] = {}
+        # (command, args, future or None for fire-and-forget)
+        self.mailbox: Deque[Tuple[Callable, tuple, Optional[asyncio.Future]]] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def _post(self, command: Callable, args: tuple, future: Optional[asyncio.Future]):
+        # A caller that kept an actor the registry has since dropped is sent to the live one
+        actor = room_actors.setdefault(self.quiz_code, self)
+        if actor is not self:
+            actor._post(command, args, future)
+            return
+        self.mailbox.append((command, args, future))
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            actor_stats["tasks_started"] += 1
+
+    def tell(self, command: Callable, *args):
+        """Queue a command without waiting for it"""
+        self._post(command, args, None)
+
+    async def call(self, command: Callable, *args) -> Any:
+        """Queue a command and wait for its result; runs inline when already on the actor"""
+        if self._task is not None and asyncio.current_task() is self._task:
+            return await run_command(command, args)
+        future = asyncio.get_running_loop().create_future()
+        self._post(command, args, future)
+        return await future
+
+    async def _run(self):
+        try:
+            while self.mailbox:
+                command, args, future = self.mailbox.popleft()
+                actor_stats["commands"] += 1
+                try:
+                    result = await run_command(command, args)
+                except Exception as e:
+                    if future is None:
+                        logger.error(f"Error in room {self.quiz_code} command {command.__name__}: {str(e)}")
+                    elif not future.done():
+                        future.set_exception(e)
+                else:
+                    if future is not None and not future.done():
+                        future.set_result(result)
+        finally:
+            self._task = None
+            # Nothing left to own: forget the actor until the room is used again
+            if not self.members and not self.mailbox and self.quiz_code not in rooms:
+                if room_actors.get(self.quiz_code) is self:
+                    del room_actors[self.quiz_code]
+
+    # Commands; run on the actor's task
+
+    def add(self, websocket: WebSocket, user_id: int):
+        self.members[websocket] = user_id
+
+    def discard(self, websocket: WebSocket):
+        self.members.pop(websocket, None)
+
+    async def broadcast(self, message: dict, exclude_ws: Optional[WebSocket] = None):
+        """Send a frame to every member except `exclude_ws`"""
+        # Stamp with a sequence number and keep it for clients that reconnect
+        if self.quiz_code in room_sessions:
+            message = get_replay_buffer(self.quiz_code).append(message)
+        if self.members:
+            with spans.span("ws.broadcast"):
+                targets = [websocket for websocket in self.members if websocket != exclude_ws]
+                shuffle = shuffles.get(self.quiz_code)
+                if shuffle is not None and ("questions" in message or "question" in message):
+                    # Shuffled quiz: every participant gets their own question and option order
+                    texts = [encode(shuffle.personalize(message, self.members[websocket])) for websocket in targets]
+                else:
+                    # Encode once for the whole room instead of once per socket
+                    texts = [encode(message)] * len(targets)
+                # Concurrent sends under one shared timeout: a stalled socket delays this frame by at most the timeout
+                failed = await send_all(zip(targets, texts))
+                if failed:
+                    self.drop(failed)
+        # Spectators are served by their own, slower tier; monitors get it tagged with the room
+        spectator_fanout.publish(self.quiz_code, message)
+        monitor_hub.publish(self.quiz_code, message)
+
+    def drop(self, websockets: List[WebSocket]):
+        """Stop sending to sockets that failed a send, and close them off the actor's task"""
+        for websocket in websockets:
+            self.members.pop(websocket, None)
+        actor_stats["send_failures"] += len(websockets)
+        task = asyncio.get_running_loop().create_task(close_slow(websockets))
+        closing_tasks.add(task)
+        task.add_done_callback(closing_tasks.discard)
+
+async def send_all(sends: Iterable[Tuple[WebSocket, str]]) -> List[WebSocket]:
+    """Send each text to its socket concurrently, waiting at most WS_SEND_TIMEOUT in total.
+
+    Returns the sockets whose send failed or was still pending at the
+    timeout; their pending sends are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    tasks = {loop.create_task(websocket.send_text(text)): websocket for websocket, text in sends}
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=settings.WS_SEND_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    failed = [tasks[task] for task in pending]
+    if pending:
+        logger.error(f"Timed out broadcasting to {len(pending)} websockets")
+    for task in done:
+        error = asyncio.CancelledError() if task.cancelled() else task.exception()
+        if error is not None:
+            logger.error(f"Error broadcasting to websocket: {error!r}")
+            failed.append(tasks[task])
+    return failed
+
+async def close_slow(websockets: List[WebSocket]):
+    # Not 1000, so the session stays resumable and a live client catches up from the replay buffer
+    loop = asyncio.get_running_loop()
+    tasks = [loop.create_task(websocket.close(code=1013, reason="Too slow")) for websocket in websockets]
+    done, pending = await asyncio.wait(tasks, timeout=settings.WS_SEND_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    # Retrieve close errors so they are not reported as never retrieved
+    for task in done:
+        if not task.cancelled():
+            task.exception()
+
+def encode(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+async def run_command(command: Callable, args: tuple) -> Any:
+    result = command(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+# quiz_code -> actor, for rooms with members, a running quiz or queued commands
+room_actors: Dict[str, RoomActor] = {}
+actor_stats = {"commands": 0, "tasks_started": 0, "send_failures": 0}
+# Closes of dropped members, kept referenced until they finish
+closing_tasks: Set[asyncio.Task] = set()
+
+def room_actor(quiz_code: str) -> RoomActor:
+    actor = room_actors.get(quiz_code)
+    if actor is None:
+        actor = room_actors[quiz_code] = RoomActor(quiz_code)
+    return actor
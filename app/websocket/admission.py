@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, mark_write
+from app.models.user import User
+from app.models.quiz import Quiz
+from app.models.quiz_connection import QuizConnection
+from app.websocket.queries import get_quiz_participants
+from app.websocket.sessions import ResumableSession, close_session, find_session, user_sessions
+
+logger = logging.getLogger(__name__)
+
+class JoinRequest:
+    __slots__ = ("email", "resume_token", "spectator", "future")
+
+    def __init__(self, email: str, resume_token: Optional[str], spectator: bool):
+        self.email = email
+        self.resume_token = resume_token
+        self.spectator = spectator  # Resolve user and quiz only, no connection row
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class JoinResult:
+    """Outcome of one admission: an error close code, or the resolved user and quiz"""
+    __slots__ = ("user", "quiz", "session", "participants", "close_code", "close_reason")
+
+    def __init__(self, user=None, quiz=None, session: Optional[ResumableSession] = None,
+                 participants: Optional[list] = None, close_code: int = 0, close_reason: str = ""):
+        self.user = user
+        self.quiz = quiz
+        self.session = session  # Set when the join resumes a parked session
+        self.participants = participants
+        self.close_code = close_code
+        self.close_reason = close_reason
+
+class JoinBatcher:
+    """Collects joins per room over a short window and admits them together.
+
+    A batch costs one user+quiz query, one multi-row QuizConnection insert,
+    one commit, one participant query and one participant broadcast, however
+    many sockets joined during the window.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.pending: Dict[str, List[JoinRequest]] = {}
+        self.stats = {"batches": 0, "joins": 0}
+        # Set by the router: broadcast the participant list after a batch
+        self.on_joined: Optional[Callable[[str, list], Awaitable]] = None
+        self._flushers: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def admit(self, quiz_code: str, email: str, resume_token: Optional[str],
+                    spectator: bool = False) -> JoinResult:
+        request = JoinRequest(email, resume_token, spectator)
+        batch = self.pending.setdefault(quiz_code, [])
+        batch.append(request)
+        if len(batch) == 1:
+            self._flushers[quiz_code] = asyncio.get_running_loop().create_task(self._flush_later(quiz_code))
+        elif len(batch) >= self.max_batch:
+            # Full batch: flush now instead of waiting out the window
+            self._flushers.pop(quiz_code).cancel()
+            task = asyncio.get_running_loop().create_task(self._flush(quiz_code, self.pending.pop(quiz_code)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await request.future
+
+    async def _flush_later(self, quiz_code: str):
+        await asyncio.sleep(self.window)
+        self._flushers.pop(quiz_code, None)
+        await self._flush(quiz_code, self.pending.pop(quiz_code, []))
+
+    async def _flush(self, quiz_code: str, batch: List[JoinRequest]):
+        if not batch:
+            return
+        try:
+            participants = await self._admit_batch(quiz_code, batch)
+        except Exception as e:
+            logger.error(f"Error admitting join batch for quiz {quiz_code}: {str(e)}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        if participants is not None and self.on_joined is not None:
+            try:
+                await self.on_joined(quiz_code, participants)
+            except Exception as e:
+                logger.error(f"Error broadcasting join batch: {str(e)}")
+
+    @staticmethod
+    def _resolve(request: JoinRequest, result: JoinResult):
+        # The joining socket may have gone away while it waited
+        if not request.future.done():
+            request.future.set_result(result)
+
+    async def _admit_batch(self, quiz_code: str, batch: List[JoinRequest]) -> Optional[list]:
+        self.stats["batches"] += 1
+        self.stats["joins"] += len(batch)
+
+        async with AsyncSessionLocal() as db:
+            # Users and the quiz in one query
+            result = await db.execute(
+                select(User, Quiz)
+                .select_from(User)
+                .outerjoin(Quiz, Quiz.code == quiz_code)
+                .where(User.email.in_({request.email for request in batch}))
+            )
+            rows = result.all()
+            users = {user.email: user for user, _ in rows}
+            quiz = rows[0][1] if rows else None
+
+            new_joins = []
+            inserts = []
+            existing = user_sessions(quiz_code)
+            seated = set(existing)
+            for request in batch:
+                user = users.get(request.email)
+                if user is None:
+                    self._resolve(request, JoinResult(close_code=4002, close_reason="User not found"))
+                    continue
+                if quiz is None:
+                    self._resolve(request, JoinResult(close_code=4003, close_reason="Quiz not found"))
+                    continue
+                if request.spectator:
+                    self._resolve(request, JoinResult(user=user, quiz=quiz))
+                    continue
+                session = find_session(request.resume_token, quiz_code, user.id)
+                if session is not None:
+                    # Claim the parked session now so its grace timer cannot fire in between
+                    if session.expiry is not None:
+                        session.expiry.cancel()
+                        session.expiry = None
+                    self._resolve(request, JoinResult(user=user, quiz=quiz, session=session))
+                    continue
+                new_joins.append((request, user))
+                held = existing.get(user.id)
+                if held:
+                    # Joined again without the token (e.g. a reload): the parked seat is
+                    # replaced, so its expiry cannot remove the user's row and scores later
+                    for session in held:
+                        if session.websocket is None:
+                            close_session(session)
+                if user.id not in seated:
+                    seated.add(user.id)
+                    inserts.append({"quiz_id": quiz.id, "user_id": user.id})
+
+            if not new_joins:
+                return None
+
+            if inserts:
+                # All new connection records in one multi-row insert; users already seated keep theirs
+                await db.execute(QuizConnection.__table__.insert(), inserts)
+                await db.commit()
+                mark_write(quiz.id)
+
+            participants = await get_quiz_participants(db, quiz.id)
+
+        for request, user in new_joins:
+            self._resolve(request, JoinResult(user=user, quiz=quiz, participants=participants))
+        return participants
+
+join_batcher = JoinBatcher(settings.WS_JOIN_BATCH_WINDOW, settings.WS_JOIN_BATCH_MAX)
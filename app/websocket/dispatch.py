@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import time
+import traceback
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Type
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+from app.core.heartbeat import heartbeat
+from app.core.profiling import spans
+from app.core.rate_limit import ConnectionRateLimiter, Overloaded, room_work
+
+logger = logging.getLogger(__name__)
+
+class ConnectionContext:
+    """Compact per-socket record handed to every message handler.
+
+    Only ints and the room's shared code string are kept: handlers open a
+    short-lived database session per message instead of each socket
+    holding one, with its ORM objects, for its whole lifetime.
+    """
+    __slots__ = (
+        "websocket", "quiz_code", "quiz_id", "user_id", "host_id", "session",
+        "limiter", "close_code", "pending", "processor"
+    )
+
+    def __init__(self, websocket: WebSocket, quiz_code: str, limiter: ConnectionRateLimiter):
+        self.websocket = websocket
+        self.quiz_code = quiz_code
+        self.quiz_id: Optional[int] = None
+        self.user_id: Optional[int] = None
+        self.host_id: Optional[int] = None  # The quiz's creator, who runs the room
+        self.session = None
+        self.limiter = limiter
+        self.close_code: Optional[int] = None
+        # Frames waiting for a handler and the task running them; both only exist while busy
+        self.pending: Optional[Deque[dict]] = None
+        self.processor: Optional[asyncio.Task] = None
+
+class Handler:
+    __slots__ = ("func", "model", "db_work", "host_only", "span")
+
+    def __init__(self, message_type: str, func, model: Type[BaseModel], db_work: bool, host_only: bool):
+        self.func = func
+        self.model = model
+        self.db_work = db_work  # Counts against the room's database work cap
+        self.host_only = host_only  # Only the quiz's creator may send it
+        self.span = f"ws.{message_type}"
+
+# message type -> handler; filled by @handler in the router
+handlers: Dict[str, Handler] = {}
+
+def handler(message_type: str, model: Type[BaseModel], db_work: bool = False, host_only: bool = False):
+    """Register `func(ctx, message)` for a message type.
+
+    The handler gets the frame decoded into `model` and returns True when
+    the connection should close afterwards.
+    """
+    def register(func: Callable[[ConnectionContext, Any], Awaitable[Optional[bool]]]):
+        handlers[message_type] = Handler(message_type, func, model, db_work, host_only)
+        return func
+    return register
+
+async def send_error(ctx: ConnectionContext, code: str, message_type: Optional[str], **extra):
+    frame = {"type": "error", "code": code, "message_type": message_type}
+    frame.update(extra)
+    try:
+        await ctx.websocket.send_json(frame)
+    except Exception as e:
+        logger.error(f"Error sending error frame: {str(e)}")
+
+async def dispatch(ctx: ConnectionContext, data: dict) -> bool:
+    """Decode and run one message; errors are reported to the client, not raised"""
+    message_type = data.get("type")
+    entry = handlers.get(message_type)
+    if entry is None:
+        await send_error(ctx, "unknown_message", message_type)
+        return False
+    if entry.host_only and ctx.user_id != ctx.host_id:
+        await send_error(ctx, "forbidden", message_type)
+        return False
+
+    try:
+        message = entry.model.parse_obj(data)
+    except ValidationError as e:
+        await send_error(ctx, "invalid_message", message_type, details=[
+            {"field": ".".join(str(loc) for loc in error["loc"]), "message": error["msg"]}
+            for error in e.errors()
+        ])
+        return False
+
+    # Bound the database work in flight for this room
+    if entry.db_work:
+        try:
+            await room_work.acquire(ctx.quiz_code)
+        except Overloaded:
+            await send_error(ctx, "overloaded", message_type)
+            return False
+
+    started = time.perf_counter()
+    try:
+        return bool(await entry.func(ctx, message))
+    except Exception as e:
+        logger.error(f"Error handling {message_type}: {str(e)}")
+        logger.error(traceback.format_exc())
+        await send_error(ctx, "internal_error", message_type)
+        return False
+    finally:
+        if entry.db_work:
+            room_work.release(ctx.quiz_code)
+        spans.record(entry.span, time.perf_counter() - started)
+
+async def read_messages(ctx: ConnectionContext):
+    """Receive frames as they arrive; only cheap checks run here, handlers run in process_messages"""
+    websocket = ctx.websocket
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            heartbeat.touch(websocket)
+
+            raw = message.get("text")
+            if raw is None:
+                raw = message.get("bytes") or b""
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            message_type = data.get("type") if isinstance(data, dict) else None
+            if not isinstance(message_type, str):
+                await send_error(ctx, "invalid_message", None, details=[
+                    {"field": "type", "message": "Expected a JSON object with a type"}
+                ])
+                continue
+
+            if message_type == "pong":
+                continue
+            if message_type == "ping":
+                await websocket.send_json({"type": "pong"})
+                continue
+            if ctx.close_code is not None:
+                # Left already, waiting for the close handshake
+                continue
+
+            # Admission control: per-connection token buckets
+            retry_after = ctx.limiter.check(message_type)
+            if retry_after:
+                await send_error(ctx, "rate_limited", message_type, retry_after=round(retry_after, 3))
+                continue
+
+            if ctx.pending is None:
+                ctx.pending = deque()
+            elif len(ctx.pending) >= settings.WS_MESSAGE_QUEUE_SIZE:
+                await send_error(ctx, "queue_full", message_type)
+                continue
+            ctx.pending.append(data)
+            if ctx.processor is None:
+                ctx.processor = asyncio.get_running_loop().create_task(process_messages(ctx))
+    except WebSocketDisconnect as e:
+        if ctx.close_code is None:
+            ctx.close_code = e.code
+
+async def process_messages(ctx: ConnectionContext):
+    """Run queued handlers one at a time in arrival order, then exit until the next frame"""
+    try:
+        while ctx.pending:
+            if await dispatch(ctx, ctx.pending.popleft()):
+                # A handler asked to close the connection
+                ctx.pending.clear()
+                try:
+                    await ctx.websocket.close(code=ctx.close_code or 1000)
+                except Exception:
+                    pass
+    finally:
+        ctx.pending = None
+        ctx.processor = None
+
+async def run_pipeline(ctx: ConnectionContext):
+    """Read and process a connection's messages concurrently until it closes.
+
+    A slow handler (commit, leaderboard query) does not stop the socket
+    from being read: frames queue up to WS_MESSAGE_QUEUE_SIZE deep and are
+    handled in order by a processor task that exists only while frames are
+    waiting, so an idle connection is just this coroutine parked in
+    receive(). On disconnect the frames already queued still run.
+    """
+    try:
+        await read_messages(ctx)
+        processor = ctx.processor
+        if processor is not None:
+            await processor
+    finally:
+        if ctx.processor is not None:
+            ctx.processor.cancel()
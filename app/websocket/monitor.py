@@ -0,0 +1,127 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set
+from fastapi import WebSocket
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.security import is_admin
+from app.models.quiz import Quiz
+
+logger = logging.getLogger(__name__)
+
+class MonitorConnection:
+    """One monitor socket and the rooms it is subscribed to.
+
+    Frames are queued and written by a task that only runs while the queue
+    is not empty, so a slow monitor never holds up the rooms it watches;
+    one that falls WS_MONITOR_QUEUE_SIZE frames behind is closed.
+    """
+    __slots__ = ("websocket", "user_id", "email", "rooms", "outbox", "writer", "overflowed")
+
+    def __init__(self, websocket: WebSocket, user_id: int, email: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.email = email
+        self.rooms: Set[str] = set()
+        self.outbox: Deque[str] = deque()
+        self.writer: Optional[asyncio.Task] = None
+        self.overflowed = False
+
+    def push(self, text: str):
+        if self.overflowed:
+            return
+        if len(self.outbox) >= settings.WS_MONITOR_QUEUE_SIZE:
+            # The running writer closes the socket once its current send returns
+            self.overflowed = True
+            self.outbox.clear()
+            monitor_hub.stats["overflows"] += 1
+            return
+        self.outbox.append(text)
+        if self.writer is None:
+            self.writer = asyncio.get_running_loop().create_task(self._write())
+
+    async def _write(self):
+        try:
+            while self.outbox:
+                await self.websocket.send_text(self.outbox.popleft())
+                monitor_hub.stats["frames_sent"] += 1
+            if self.overflowed:
+                await self.websocket.close(code=1013, reason="Monitor too slow")
+        except Exception as e:
+            logger.error(f"Error writing to monitor socket: {str(e)}")
+            self.outbox.clear()
+        finally:
+            self.writer = None
+
+class MonitorHub:
+    """Room frames for monitor sockets, tagged with their room code.
+
+    A frame is encoded once per room and pushed to each subscriber, so a
+    socket watching 40 rooms costs one registration per room and no
+    database work per frame.
+    """
+
+    def __init__(self):
+        self.connections: Set[MonitorConnection] = set()
+        # quiz_code -> subscribed monitors
+        self.subscribers: Dict[str, Set[MonitorConnection]] = {}
+        self.stats = {"frames_published": 0, "frames_sent": 0, "overflows": 0}
+
+    def add(self, connection: MonitorConnection):
+        self.connections.add(connection)
+
+    def subscribe(self, connection: MonitorConnection, quiz_code: str):
+        self.subscribers.setdefault(quiz_code, set()).add(connection)
+        connection.rooms.add(quiz_code)
+
+    def unsubscribe(self, connection: MonitorConnection, quiz_code: str):
+        connection.rooms.discard(quiz_code)
+        subscribers = self.subscribers.get(quiz_code)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.subscribers[quiz_code]
+
+    def remove(self, connection: MonitorConnection):
+        self.connections.discard(connection)
+        for quiz_code in list(connection.rooms):
+            self.unsubscribe(connection, quiz_code)
+        if connection.writer is not None:
+            connection.writer.cancel()
+
+    def drop(self, websocket: WebSocket):
+        """Heartbeat eviction: stop queueing frames for a dead socket"""
+        for connection in list(self.connections):
+            if connection.websocket is websocket:
+                self.remove(connection)
+
+    def publish(self, quiz_code: str, message: dict):
+        subscribers = self.subscribers.get(quiz_code)
+        if not subscribers:
+            return
+        self.stats["frames_published"] += 1
+        text = json.dumps({**message, "room": quiz_code}, separators=(",", ":"), ensure_ascii=False, default=str)
+        for connection in subscribers:
+            connection.push(text)
+
+    def send(self, connection: MonitorConnection, message: dict):
+        """Queue a frame for one monitor, behind the room frames already queued for it"""
+        connection.push(json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str))
+
+async def rejected_rooms(db, connection: MonitorConnection, codes: Iterable[str]) -> Dict[str, str]:
+    """Room code -> rejection reason for every code this user may not monitor, in one query"""
+    codes = set(codes)
+    result = await db.execute(select(Quiz.code, Quiz.created_by_id).where(Quiz.code.in_(codes)))
+    owners = {code: created_by_id for code, created_by_id in result.all()}
+    admin = is_admin(connection.email)
+    rejected = {}
+    for code in codes:
+        if code not in owners:
+            rejected[code] = "not_found"
+        elif not admin and owners[code] != connection.user_id:
+            rejected[code] = "forbidden"
+    return rejected
+
+monitor_hub = MonitorHub()
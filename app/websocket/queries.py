@@ -0,0 +1,186 @@
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.user import User
+from app.models.quiz import Quiz
+from app.models.quiz_connection import QuizConnection
+from app.models.quiz_score import QuizParticipantScore
+from app.models.quiz_session import QuizSession, QuizSessionScore
+from app.models.user_stats import UserStats
+
+async def get_quiz_participants(db, quiz_id: int):
+    """Get current quiz participants from DB"""
+    result = await db.execute(
+        select(User)
+        .join(QuizConnection, QuizConnection.user_id == User.id)
+        .where(QuizConnection.quiz_id == quiz_id)
+    )
+    return [
+        {
+            "id": str(user.id),
+            "email": user.email
+        }
+        for user in result.scalars().all()
+    ]
+
+async def handle_start_quiz(db, quiz_id: int):
+    """Initialize scores for all participants; returns the quiz with its questions loaded"""
+    # Get current participants
+    result = await db.execute(
+        select(User.id)
+        .join(QuizConnection, QuizConnection.user_id == User.id)
+        .where(QuizConnection.quiz_id == quiz_id)
+    )
+    
+    # Update quiz status to running
+    quiz = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
+    quiz = quiz.scalar_one()
+    quiz.status = 'running'
+
+    # Open a session for this run, unless a restart continues the current one
+    running = await db.execute(
+        select(QuizSession.id).where(QuizSession.quiz_id == quiz_id, QuizSession.ended_at.is_(None))
+    )
+    if running.first() is None:
+        db.add(QuizSession(quiz_id=quiz_id))
+    
+    # Initialize scores
+    for (user_id,) in result.all():
+        existing_score = await db.execute(
+            select(QuizParticipantScore)
+            .where(
+                QuizParticipantScore.quiz_id == quiz_id,
+                QuizParticipantScore.user_id == user_id
+            )
+        )
+        if not existing_score.scalar_one_or_none():
+            score = QuizParticipantScore(
+                quiz_id=quiz_id,
+                user_id=user_id,
+                score=0
+            )
+            db.add(score)
+    await db.commit()
+    return quiz
+
+async def get_leaderboard(db, quiz_id: int):
+    """Get current leaderboard from DB"""
+    result = await db.execute(
+        select(
+            QuizParticipantScore.user_id,
+            User.email,
+            QuizParticipantScore.score
+        )
+        .join(User, User.id == QuizParticipantScore.user_id)
+        .where(QuizParticipantScore.quiz_id == quiz_id)
+        .order_by(QuizParticipantScore.score.desc())
+    )
+    return [
+        {
+            "user_id": str(user_id),
+            "email": email,
+            "score": score
+        }
+        for user_id, email, score in result.all()
+    ]
+
+# quiz_id -> id of the quiz's running session; dropped when the quiz is started or ended
+running_sessions: Dict[int, int] = {}
+
+async def running_session_id(db, quiz_id: int) -> Optional[int]:
+    """Id of the quiz's open session, or None when it is not running (not cached)"""
+    session_id = running_sessions.get(quiz_id)
+    if session_id is None:
+        result = await db.execute(
+            select(QuizSession.id)
+            .where(QuizSession.quiz_id == quiz_id, QuizSession.ended_at.is_(None))
+            .order_by(QuizSession.id.desc())
+            .limit(1)
+        )
+        session_id = result.scalar_one_or_none()
+        if session_id is not None:
+            running_sessions[quiz_id] = session_id
+    return session_id
+
+def upsert_user_stats(dialect: str):
+    """INSERT for first-time players that folds one session into existing rows otherwise"""
+    stats = UserStats.__table__
+    insert = mysql_insert(stats) if dialect == "mysql" else sqlite_insert(stats)
+    insert = insert.values(last_played_at=func.now())
+    # MySQL names the proposed row "inserted" (VALUES()), SQLite "excluded"
+    new = insert.inserted if dialect == "mysql" else insert.excluded
+    merged = {
+        "sessions_played": stats.c.sessions_played + 1,
+        "total_score": stats.c.total_score + new.total_score,
+        "best_score": case((stats.c.best_score < new.best_score, new.best_score), else_=stats.c.best_score),
+        "best_rank": case(
+            (or_(stats.c.best_rank.is_(None), stats.c.best_rank > new.best_rank), new.best_rank),
+            else_=stats.c.best_rank
+        ),
+        "last_played_at": new.last_played_at
+    }
+    if dialect == "mysql":
+        return insert.on_duplicate_key_update(**merged)
+    return insert.on_conflict_do_update(index_elements=[stats.c.user_id], set_=merged)
+
+async def archive_session(db, quiz_id: int) -> List[int]:
+    """Close the quiz's running session, archive its final scores and fold them into user stats.
+
+    Does not commit; returns the ids of the users whose stats changed.
+    """
+    result = await db.execute(
+        select(QuizSession)
+        .where(QuizSession.quiz_id == quiz_id, QuizSession.ended_at.is_(None))
+        .order_by(QuizSession.id.desc())
+    )
+    open_sessions = result.scalars().all()
+
+    result = await db.execute(
+        select(QuizParticipantScore.user_id, QuizParticipantScore.score)
+        .where(QuizParticipantScore.quiz_id == quiz_id)
+        .order_by(QuizParticipantScore.score.desc())
+    )
+    scores = result.all()
+    if not open_sessions and not scores:
+        # Nothing was played, don't record an empty session
+        return []
+
+    if open_sessions:
+        quiz_session = open_sessions[0]
+    else:
+        # Started before sessions were tracked
+        quiz_session = QuizSession(quiz_id=quiz_id)
+        db.add(quiz_session)
+        await db.flush()
+
+    # Competition ranking: equal scores share a rank
+    rows = []
+    for position, (user_id, score) in enumerate(scores, start=1):
+        rank = rows[-1]["rank"] if rows and rows[-1]["score"] == score else position
+        rows.append({"session_id": quiz_session.id, "quiz_id": quiz_id, "user_id": user_id, "score": score, "rank": rank})
+
+    await db.execute(
+        update(QuizSession)
+        .where(QuizSession.id.in_([s.id for s in open_sessions] or [quiz_session.id]))
+        .values(ended_at=func.now())
+    )
+    await db.execute(
+        update(QuizSession).where(QuizSession.id == quiz_session.id).values(participant_count=len(rows))
+    )
+    if not rows:
+        return []
+    await db.execute(QuizSessionScore.__table__.insert(), rows)
+
+    # Incremental aggregates, one multi-row upsert for all players
+    await db.execute(upsert_user_stats(db.bind.dialect.name), [
+        {
+            "user_id": row["user_id"],
+            "sessions_played": 1,
+            "total_score": row["score"],
+            "best_score": row["score"],
+            "best_rank": row["rank"]
+        }
+        for row in rows
+    ])
+    return [row["user_id"] for row in rows]
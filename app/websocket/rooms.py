@@ -0,0 +1,88 @@
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.timer_wheel import TimerHandle
+
+class QuizRoom:
+    """In-memory progression state of a running quiz"""
+
+    def __init__(self, quiz_code: str, quiz_id: int, questions: List[dict], time_limit: int, progressive: bool = False):
+        self.quiz_code = quiz_code
+        self.quiz_id = quiz_id
+        self.questions = questions  # Ordered, including correctAnswer
+        self.question_ids = [q["id"] for q in questions]
+        self.time_limit = time_limit
+        self.progressive = progressive
+        # question id -> (correct answer, score), so grading needs no DB lookup
+        self.answer_key: Dict[int, Tuple[int, int]] = {
+            q["id"]: (q["correctAnswer"], q["score"]) for q in questions
+        }
+        # Client payloads are built once per room, without the correct answer
+        self.payloads = [
+            {"id": q["id"], "text": q["text"], "options": q["options"], "score": q["score"]}
+            for q in questions
+        ]
+        self.current = -1
+        self.deadline: Optional[float] = None  # time.monotonic() when the current question closes
+        self.answered: Set[int] = set()  # user ids that answered the current question
+        self.timer: Optional[TimerHandle] = None
+
+    @property
+    def timed(self) -> bool:
+        return self.time_limit > 0
+
+    @property
+    def current_question_id(self) -> Optional[int]:
+        if 0 <= self.current < len(self.question_ids):
+            return self.question_ids[self.current]
+        return None
+
+    def advance(self) -> Optional[int]:
+        """Move to the next question and return its id, or None when finished"""
+        self.current += 1
+        self.answered.clear()
+        if self.current_question_id is None:
+            self.deadline = None
+            return None
+        self.deadline = time.monotonic() + self.time_limit if self.timed else None
+        return self.current_question_id
+
+    def advance_delay(self) -> float:
+        """Seconds until the timer moves on: the deadline plus the late-answer grace"""
+        # Advancing at the deadline itself would turn late-but-graceful answers into not_active
+        return max(0.0, self.deadline + settings.ANSWER_LATE_GRACE - time.monotonic())
+
+    def check_answer(self, user_id: int, question_id: int) -> Optional[str]:
+        """Return a rejection reason, or None if the answer is accepted"""
+        if question_id != self.current_question_id:
+            return "not_active"
+        if self.deadline is not None and time.monotonic() > self.deadline + settings.ANSWER_LATE_GRACE:
+            return "late"
+        if user_id in self.answered:
+            return "duplicate"
+        self.answered.add(user_id)
+        return None
+
+    def question_frame(self) -> dict:
+        """Frame announcing the current question; carries the question itself in progressive mode"""
+        frame = {
+            "type": "question_started",
+            "quiz_id": str(self.quiz_id),
+            "question_id": self.current_question_id,
+            "index": self.current,
+            "total": len(self.question_ids),
+            "time_limit": self.time_limit
+        }
+        if self.timed:
+            frame["ends_at"] = int((time.time() + self.deadline - time.monotonic()) * 1000)
+        if self.progressive:
+            frame["question"] = self.payloads[self.current]
+        return frame
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+# quiz_code -> running room with server-driven timing or progressive delivery
+rooms: Dict[str, QuizRoom] = {}
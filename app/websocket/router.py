@@ -1,107 +1,425 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from sqlalchemy import delete, select, func
+from pydantic import ValidationError
+from sqlalchemy import delete, select, update
+import asyncio
+import json
 import logging
+import sys
 import traceback
 from app.core.security import decode_access_token
-from app.core.websocket import ConnectionManager
-from app.db.session import AsyncSessionLocal
+from app.core.answer_log import answer_log
+from app.core.timer_wheel import timer_wheel
+from app.core.heartbeat import heartbeat
+from app.core.rate_limit import ConnectionRateLimiter
+from app.core.responses import quiz_response_cache
+from app.core.config import settings
+from app.core.recorder import frame_recorder
+from app.db.session import AsyncSessionLocal, mark_write
 from app.models.user import User
 from app.models.quiz import Quiz, Question
 from app.models.quiz_connection import QuizConnection
 from app.models.quiz_score import QuizParticipantScore
-from sqlalchemy import func
-from typing import Dict, Set
+from app.websocket.rooms import QuizRoom, rooms
+from app.websocket.queries import (
+    get_quiz_participants, handle_start_quiz, get_leaderboard, archive_session,
+    running_session_id, running_sessions
+)
+from app.websocket.admission import join_batcher
+from app.websocket.actor import RoomActor, room_actor, room_actors
+from app.websocket.shuffle import load_shuffle, personalize, room_shuffle, shuffles
+from app.websocket.monitor import MonitorConnection, monitor_hub, rejected_rooms
+from app.websocket.spectators import spectator_fanout, spectate
+from app.websocket.dispatch import ConnectionContext, handler, run_pipeline
+from app.schemas.websocket import EmptyMessage, MonitorRooms, SubmitAnswer, SubmitAnswers
+from app.websocket.sessions import (
+    ResumableSession, replay_buffers, get_replay_buffer,
+    open_session, close_session, has_session
+)
+from typing import List, Optional, Set, Tuple
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Store only active websocket connections
-active_connections: Dict[str, Set[WebSocket]] = {}
+# Set during shutdown so closing sockets keep their seats for the next process
+draining = False
+
+# Keep references to fire-and-forget tasks started from timer callbacks
+background_tasks: Set[asyncio.Task] = set()
+
+def spawn(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+def drop_evicted(websocket: WebSocket):
+    """Heartbeat eviction: stop broadcasting to a dead socket right away"""
+    for actor in list(room_actors.values()):
+        if websocket in actor.members:
+            actor.tell(actor.discard, websocket)
+    spectator_fanout.drop(websocket)
+    monitor_hub.drop(websocket)
+
+heartbeat.on_evict = drop_evicted
 
 async def broadcast_to_quiz(quiz_code: str, message: dict, exclude_ws: WebSocket = None):
     """Send message to all connections in a quiz except the sender"""
-    if quiz_code in active_connections:
-        for websocket in active_connections[quiz_code]:
-            if websocket != exclude_ws:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to websocket: {str(e)}")
-
-async def get_quiz_participants(db, quiz_id: int):
-    """Get current quiz participants from DB"""
-    result = await db.execute(
-        select(User)
-        .join(QuizConnection, QuizConnection.user_id == User.id)
-        .where(QuizConnection.quiz_id == quiz_id)
-    )
-    return [
+    actor = room_actor(quiz_code)
+    await actor.call(actor.broadcast, message, exclude_ws)
+
+async def attach_caught_up(actor: RoomActor, websocket: WebSocket, user_id: int, seq: int):
+    """Actor command: send frames after `seq` and join the room, so no broadcast falls in between"""
+    missed = get_replay_buffer(actor.quiz_code).since(seq) or []
+
+    async def catch_up():
+        for frame in missed:
+            await websocket.send_json(personalize(actor.quiz_code, frame, user_id))
+
+    # Bounded like broadcasts, so a socket that stalls here does not hold up the room
+    try:
+        await asyncio.wait_for(catch_up(), timeout=settings.WS_SEND_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Error catching up resumed websocket: {e!r}")
+        actor.drop([websocket])
+        return
+    actor.add(websocket, user_id)
+
+def quiz_info(quiz) -> dict:
+    return {
+        "id": str(quiz.id),
+        "code": quiz.code,
+        "title": quiz.title,
+        "description": quiz.description,
+        "created_by": str(quiz.created_by_id)
+    }
+
+async def broadcast_joined(quiz_code: str, participants: list):
+    """One participant update per admitted join batch"""
+    await broadcast_to_quiz(quiz_code, {
+        "type": "room_participants",
+        "participants": participants
+    })
+
+join_batcher.on_joined = broadcast_joined
+
+def advance_question(room: QuizRoom):
+    """Timer wheel callback for timed rooms: hand the advance to the room's actor"""
+    room_actor(room.quiz_code).tell(open_next_question, room)
+
+async def open_next_question(room: QuizRoom):
+    """Actor command: open the room's next question, or close questions after the last one"""
+    room.close()
+    if rooms.get(room.quiz_code) is not room:
+        return
+    # Loaded before the question goes out, also for rooms restored from a snapshot
+    await room_shuffle(room.quiz_code, room.quiz_id)
+
+    question_id = room.advance()
+    if question_id is None:
+        await broadcast_to_quiz(room.quiz_code, {
+            "type": "questions_closed",
+            "quiz_id": str(room.quiz_id)
+        })
+        return
+
+    if room.timed:
+        room.timer = timer_wheel.call_later(room.advance_delay(), advance_question, room)
+    await broadcast_to_quiz(room.quiz_code, room.question_frame())
+
+def stop_room(quiz_code: str):
+    room = rooms.pop(quiz_code, None)
+    if room:
+        room.close()
+
+async def drain_connections():
+    """Close every socket for a restart; their sessions stay resumable"""
+    global draining
+    draining = True
+    members = [actor.members for actor in room_actors.values()]
+    monitors = [connection.websocket for connection in monitor_hub.connections]
+    for connections in members + list(spectator_fanout.spectators.values()) + [monitors]:
+        for websocket in list(connections):
+            try:
+                await websocket.close(code=1012, reason="Server restarting")
+            except Exception:
+                pass
+
+async def remove_participant(quiz_code: str, quiz_id: int, user_id: int):
+    """Delete a participant's connection and scores, then broadcast the new participant list"""
+    if has_session(quiz_code, user_id):
+        # Still seated through another socket (a second tab, or a join without the resume token)
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(QuizConnection).where(
+                    QuizConnection.quiz_id == quiz_id,
+                    QuizConnection.user_id == user_id
+                )
+            )
+            await db.execute(
+                delete(QuizParticipantScore).where(
+                    QuizParticipantScore.quiz_id == quiz_id,
+                    QuizParticipantScore.user_id == user_id
+                )
+            )
+            await db.commit()
+            mark_write(quiz_id)
+            participants = await get_quiz_participants(db, quiz_id)
+
+        await broadcast_to_quiz(quiz_code, {
+            "type": "room_participants",
+            "participants": participants
+        })
+    except Exception as e:
+        logger.error(f"Error removing participant: {str(e)}")
+        logger.error(traceback.format_exc())
+
+def expire_session(session: ResumableSession):
+    """Timer callback: the reconnect grace window passed without a resume"""
+    session.expiry = None
+    close_session(session)
+    spawn(remove_participant(session.quiz_code, session.quiz_id, session.user_id))
+
+@handler("start_quiz", EmptyMessage, db_work=True, host_only=True)
+async def on_start_quiz(ctx: ConnectionContext, message: EmptyMessage):
+    # Run on the room's actor so concurrent start/next/end apply one after another
+    await room_actor(ctx.quiz_code).call(start_quiz, ctx.quiz_code, ctx.quiz_id)
+
+async def start_quiz(quiz_code: str, quiz_id: int):
+    async with AsyncSessionLocal() as db:
+        # The quiz and its questions are loaded here, not kept per socket
+        quiz = await handle_start_quiz(db, quiz_id)
+        running_sessions.pop(quiz.id, None)
+        # A new run gets new orders when the quiz shuffles
+        shuffle = await load_shuffle(db, quiz_code, quiz.id)
+        mark_write(quiz.id, quiz_code)
+        quiz_response_cache.invalidate(quiz_code)
+        leaderboard = await get_leaderboard(db, quiz.id)
+
+    # Format questions
+    questions = [
         {
-            "id": str(user.id),
-            "email": user.email
+            "id": q.id,
+            "text": q.text,
+            "options": q.options,
+            "correctAnswer": int(q.correct_answer),  # Ensure it's an integer
+            "score": q.score
         }
-        for user in result.scalars().all()
+        for q in sorted(quiz.questions, key=lambda x: x.order if x.order is not None else 0)  # Handle None order values
     ]
 
-async def handle_start_quiz(db, quiz_id: int):
-    """Initialize scores for all participants"""
-    # Get current participants
-    result = await db.execute(
-        select(User.id)
-        .join(QuizConnection, QuizConnection.user_id == User.id)
-        .where(QuizConnection.quiz_id == quiz_id)
-    )
-    
-    # Update quiz status to running
-    quiz = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = quiz.scalar_one()
-    quiz.status = 'running'
-    
-    # Initialize scores
-    for (user_id,) in result.all():
-        existing_score = await db.execute(
-            select(QuizParticipantScore)
-            .where(
-                QuizParticipantScore.quiz_id == quiz_id,
-                QuizParticipantScore.user_id == user_id
+    # Server-driven progression when the quiz has a time limit or
+    # delivers questions one at a time
+    time_limit = int((quiz.settings or {}).get("timeLimit") or 0)
+    progressive = (quiz.settings or {}).get("deliveryMode") == "progressive"
+    stop_room(quiz_code)
+    room = None
+    if time_limit > 0 or progressive:
+        if shuffle is not None:
+            # The room sets the pace, so everyone shares this run's question order
+            questions = shuffle.question_order(len(questions)).apply(questions)
+        room = QuizRoom(quiz_code, quiz.id, questions, time_limit, progressive)
+        rooms[quiz_code] = room
+
+    start_frame = {
+        "type": "start_quiz_now",
+        "quiz_id": str(quiz.id),
+        "leaderboard": leaderboard,
+        "time_limit": time_limit,
+        "delivery_mode": "progressive" if progressive else "bulk"
+    }
+    if progressive:
+        # Questions follow one by one, without their answers
+        start_frame["total_questions"] = len(questions)
+    else:
+        start_frame["questions"] = questions
+    await broadcast_to_quiz(quiz_code, start_frame)
+
+    if room:
+        await open_next_question(room)
+
+@handler("end_quiz", EmptyMessage, db_work=True, host_only=True)
+async def on_end_quiz(ctx: ConnectionContext, message: EmptyMessage):
+    await room_actor(ctx.quiz_code).call(end_quiz, ctx.quiz_code, ctx.quiz_id)
+
+async def end_quiz(quiz_code: str, quiz_id: int):
+    stop_room(quiz_code)
+    shuffles.pop(quiz_code, None)
+
+    async with AsyncSessionLocal() as db:
+        # Keep this run's final scores and update the players' stats before resetting
+        player_ids = await archive_session(db, quiz_id)
+        running_sessions.pop(quiz_id, None)
+
+        # Delete all participant scores for this quiz
+        await db.execute(
+            delete(QuizParticipantScore).where(
+                QuizParticipantScore.quiz_id == quiz_id
             )
         )
-        if not existing_score.scalar_one_or_none():
-            score = QuizParticipantScore(
-                quiz_id=quiz_id,
-                user_id=user_id,
-                score=0
-            )
-            db.add(score)
-    await db.commit()
-
-async def get_leaderboard(db, quiz_id: int):
-    """Get current leaderboard from DB"""
-    result = await db.execute(
-        select(
-            QuizParticipantScore.user_id,
-            User.email,
-            QuizParticipantScore.score
+
+        # Update quiz status to idle
+        await db.execute(
+            update(Quiz).where(Quiz.id == quiz_id).values(status='idle')
         )
-        .join(User, User.id == QuizParticipantScore.user_id)
-        .where(QuizParticipantScore.quiz_id == quiz_id)
-        .order_by(QuizParticipantScore.score.desc())
-    )
-    return [
-        {
-            "user_id": str(user_id),
-            "email": email,
-            "score": score
+        await db.commit()
+    mark_write(quiz_id, quiz_code, *(("user", user_id) for user_id in player_ids))
+    quiz_response_cache.invalidate(quiz_code)
+
+    # Broadcast end_quiz_now to all connections
+    await broadcast_to_quiz(quiz_code, {
+        "type": "end_quiz_now",
+        "quiz_id": str(quiz_id)
+    })
+
+@handler("next_question", EmptyMessage, host_only=True)
+async def on_next_question(ctx: ConnectionContext, message: EmptyMessage):
+    # Host-driven advance (also skips the rest of a timed question)
+    await room_actor(ctx.quiz_code).call(next_question, ctx.quiz_code)
+
+async def next_question(quiz_code: str):
+    room = rooms.get(quiz_code)
+    if room:
+        await open_next_question(room)
+
+@handler("leave", EmptyMessage)
+async def on_leave(ctx: ConnectionContext, message: EmptyMessage):
+    # Explicit leave, give up the seat without a grace period
+    ctx.close_code = 1000
+    return True
+
+async def grade_answers(ctx: ConnectionContext, answers: List[SubmitAnswer]) -> Tuple[List[dict], Optional[list]]:
+    """Grade a connection's answers with one key lookup, one score update and one commit.
+
+    Returns a result per answer, in order, and the updated leaderboard, or
+    None for the leaderboard when every answer was rejected.
+    """
+    quiz_id, quiz_code, user_id = ctx.quiz_id, ctx.quiz_code, ctx.user_id
+    room = rooms.get(quiz_code)
+    results = []
+    accepted = []
+    seen = set()
+    for item in answers:
+        result = {"question_id": item.question_id}
+        results.append(result)
+        # Reject repeats within the batch and answers outside the active question's time window
+        if item.question_id in seen:
+            result["rejected"] = "duplicate"
+            continue
+        seen.add(item.question_id)
+        if room:
+            reason = room.check_answer(user_id, item.question_id)
+            if reason:
+                result["rejected"] = reason
+                continue
+        accepted.append((result, item.answer))
+    if not accepted:
+        return results, None
+
+    async with AsyncSessionLocal() as db:
+        # Verify answers, from the room's answer key when the quiz is running in a room
+        answer_key = room.answer_key if room else {}
+        missing = [result["question_id"] for result, _ in accepted if result["question_id"] not in answer_key]
+        if missing:
+            rows = await db.execute(
+                select(Question.id, Question.correct_answer, Question.score)
+                .where(Question.quiz_id == quiz_id, Question.id.in_(missing))
+            )
+            answer_key = {**answer_key, **{row.id: (row.correct_answer, row.score) for row in rows}}
+
+        shuffle = await room_shuffle(quiz_code, quiz_id, db)
+        session_id = shuffle.session_id if shuffle is not None else await running_session_id(db, quiz_id)
+        gained = 0
+        for result, answer in accepted:
+            question_id = result["question_id"]
+            if question_id not in answer_key:
+                result["rejected"] = "unknown_question"
+                continue
+            if shuffle is not None:
+                # Options were shown in this participant's order
+                answer = shuffle.original_answer(user_id, question_id, answer)
+            correct_answer, question_score = answer_key[question_id]
+            is_correct = answer == correct_answer
+            result["is_correct"] = is_correct
+            if is_correct:
+                gained += question_score
+
+            # Append to the answer log (written in batches)
+            answer_log.record(
+                quiz_id, session_id, question_id, user_id, answer,
+                is_correct, question_score if is_correct else 0
+            )
+
+        if gained:
+            # Update score once for the whole batch
+            await db.execute(
+                QuizParticipantScore.__table__.update()
+                .where(
+                    QuizParticipantScore.quiz_id == quiz_id,
+                    QuizParticipantScore.user_id == user_id
+                )
+                .values(
+                    score=QuizParticipantScore.score + gained
+                )
+            )
+            await db.commit()
+            mark_write(quiz_id)
+
+        if not any("is_correct" in result for result, _ in accepted):
+            return results, None
+        leaderboard = await get_leaderboard(db, quiz_id)
+    return results, leaderboard
+
+@handler("submit_answer", SubmitAnswer, db_work=True)
+async def on_submit_answer(ctx: ConnectionContext, message: SubmitAnswer):
+    results, leaderboard = await grade_answers(ctx, [message])
+    result = results[0]
+    if "rejected" in result:
+        await ctx.websocket.send_json({
+            "type": "answer_rejected",
+            "question_id": message.question_id,
+            "reason": result["rejected"]
+        })
+        return
+
+    # Broadcast the updated leaderboard
+    await broadcast_to_quiz(ctx.quiz_code, {
+        "type": "leaderboard_update",
+        "leaderboard": leaderboard,
+        "answer_result": {
+            "user_id": str(ctx.user_id),
+            "question_id": message.question_id,
+            "is_correct": result["is_correct"]
         }
-        for user_id, email, score in result.all()
-    ]
+    })
+
+@handler("submit_answers", SubmitAnswers, db_work=True)
+async def on_submit_answers(ctx: ConnectionContext, message: SubmitAnswers):
+    results, leaderboard = await grade_answers(ctx, message.answers)
+    # Every answer's outcome in one reply, then one leaderboard update for the batch
+    await ctx.websocket.send_json({
+        "type": "answers_result",
+        "results": results
+    })
+    if leaderboard is not None:
+        await broadcast_to_quiz(ctx.quiz_code, {
+            "type": "leaderboard_update",
+            "leaderboard": leaderboard,
+            "answer_results": [
+                {"user_id": str(ctx.user_id), "question_id": result["question_id"], "is_correct": result["is_correct"]}
+                for result in results if "is_correct" in result
+            ]
+        })
 
 @router.websocket("/ws/quiz/{quiz_code}")
 async def websocket_endpoint(websocket: WebSocket, quiz_code: str):
-    db = None
-    current_user = None
-    quiz = None
+    # One shared code string per room instead of one per socket
+    quiz_code = sys.intern(quiz_code)
+    user_id = None
+    quiz_id = None
+    session = None
+    ctx = ConnectionContext(websocket, quiz_code, ConnectionRateLimiter())
 
     try:
         # Validate token
@@ -121,158 +439,112 @@ async def websocket_endpoint(websocket: WebSocket, quiz_code: str):
             await websocket.close(code=4004, reason="Token validation failed")
             return
 
-        # Initialize database session
-        db = AsyncSessionLocal()
+        # Capture this connection's frames when recording is on (WS_RECORD_PATH)
+        websocket = ctx.websocket = frame_recorder.wrap(websocket, quiz_code, email)
 
-        # Get user and quiz
-        result = await db.execute(
-            select(User).where(User.email == email)
+        # Resolve user and quiz and record the connection, batched with other joins to this room
+        spectator = websocket.query_params.get("role") == "spectator"
+        joined = await join_batcher.admit(
+            quiz_code, email, websocket.query_params.get("resume"), spectator
         )
-        current_user = result.scalar_one_or_none()
+        if joined.close_code:
+            await websocket.close(code=joined.close_code, reason=joined.close_reason)
+            return
+        # Keep ids only; the ORM objects go away with `joined` once the join is set up
+        user_id = joined.user.id
+        quiz_id = joined.quiz.id
+        host_id = joined.quiz.created_by_id
 
-        if not current_user:
-            await websocket.close(code=4002, reason="User not found")
+        if spectator:
+            # Watch-only: no connection row, no score, no database session
+            heartbeat.register(websocket)
+            spectator_fanout.add(quiz_code, websocket)
+            await websocket.send_json({
+                "type": "spectating",
+                "quiz": quiz_info(joined.quiz),
+                "interval": settings.WS_SPECTATOR_INTERVAL
+            })
+            del joined
+            room = rooms.get(quiz_code)
+            if room and room.current_question_id is not None:
+                await websocket.send_json(room.question_frame())
+            await spectate(websocket)
             return
 
-        result = await db.execute(
-            select(Quiz).where(Quiz.code == quiz_code)
-        )
-        quiz = result.scalar_one_or_none()
+        # Once per room: whether questions go out in a per-participant order
+        await room_shuffle(quiz_code, quiz_id)
 
-        if not quiz:
-            await websocket.close(code=4003, reason="Quiz not found")
-            return
+        session = joined.session
+        if session:
+            # Resume: reattach without touching the DB or the participant list
+            stale = session.websocket
+            session.websocket = websocket
+            if stale is not None:
+                # The old socket is half-open; take its place
+                actor = room_actor(quiz_code)
+                await actor.call(actor.discard, stale)
+                try:
+                    await stale.close(code=4000, reason="Session resumed elsewhere")
+                except Exception:
+                    pass
 
-        # Create connection record
-        connection = QuizConnection(quiz_id=quiz.id, user_id=current_user.id)
-        db.add(connection)
-        await db.commit()
+            buffer = get_replay_buffer(quiz_code)
+            last_seq = int(websocket.query_params.get("last_seq", session.last_seq))
+            missed = buffer.since(last_seq)
+            await websocket.send_json({
+                "type": "resumed",
+                "resume_token": session.token,
+                "complete": missed is not None
+            })
+            seq = last_seq
+            if missed is None:
+                # Too far behind for the buffer, send a fresh participant list
+                async with AsyncSessionLocal() as db:
+                    participants = await get_quiz_participants(db, quiz_id)
+                seq = buffer.last_seq
+                await websocket.send_json({
+                    "type": "room_participants",
+                    "participants": participants,
+                    "seq": seq
+                })
+                missed = []
+            # Replay the backlog, then the room's actor sends the rest and adds the socket
+            for frame in missed:
+                await websocket.send_json(personalize(quiz_code, frame, user_id))
+                seq = frame["seq"]
+            actor = room_actor(quiz_code)
+            await actor.call(attach_caught_up, actor, websocket, user_id, seq)
+            heartbeat.register(websocket)
+        else:
+            # The join batch already wrote the connection record
+            session = open_session(quiz_code, quiz_id, user_id, websocket)
 
-        # Add to active connections
-        if quiz_code not in active_connections:
-            active_connections[quiz_code] = set()
-        active_connections[quiz_code].add(websocket)
+            # Start receiving the room's broadcasts
+            actor = room_actor(quiz_code)
+            await actor.call(actor.add, websocket, user_id)
+            heartbeat.register(websocket)
 
-        # Send initial participant list
-        participants = await get_quiz_participants(db, quiz.id)
-        await websocket.send_json({
-            "type": "room_participants",
-            "quiz": {
-                "id": str(quiz.id),
-                "code": quiz.code,
-                "title": quiz.title,
-                "description": quiz.description,
-                "created_by": str(quiz.created_by_id)
-            },
-            "participants": participants
-        })
+            # Send initial participant list; the batch broadcasts it to everyone else
+            participants = joined.participants
+            await websocket.send_json({
+                "type": "room_participants",
+                "quiz": quiz_info(joined.quiz),
+                "participants": participants,
+                "resume_token": session.token
+            })
 
-        # Broadcast updated participant list to all connections
-        await broadcast_to_quiz(quiz_code, {
-            "type": "room_participants",
-            "participants": participants
-        }, websocket)
+            # Late joiner: catch up on the question that is currently open
+            room = rooms.get(quiz_code)
+            if room and room.current_question_id is not None:
+                await websocket.send_json(personalize(quiz_code, room.question_frame(), user_id))
 
-        # Main message loop
-        while True:
-            try:
-                data = await websocket.receive_json()
-                
-                if data["type"] == "start_quiz":
-                    await handle_start_quiz(db, quiz.id)
-                    leaderboard = await get_leaderboard(db, quiz.id)
-                    
-                    # Format questions
-                    questions = [
-                        {
-                            "id": q.id,
-                            "text": q.text,
-                            "options": q.options,
-                            "correctAnswer": int(q.correct_answer),  # Ensure it's an integer
-                            "score": q.score
-                        }
-                        for q in sorted(quiz.questions, key=lambda x: x.order if x.order is not None else 0)  # Handle None order values
-                    ]
-                    
-                    await broadcast_to_quiz(quiz_code, {
-                        "type": "start_quiz_now",
-                        "quiz_id": str(quiz.id),
-                        "leaderboard": leaderboard,
-                        "questions": questions
-                    })
-                
-                elif data["type"] == "end_quiz":
-                    # Delete all participant scores for this quiz
-                    await db.execute(
-                        delete(QuizParticipantScore).where(
-                            QuizParticipantScore.quiz_id == quiz.id
-                        )
-                    )
-                    
-                    # Update quiz status to idle
-                    quiz.status = 'idle'
-                    await db.commit()
-                    
-                    # Broadcast end_quiz_now to all connections
-                    await broadcast_to_quiz(quiz_code, {
-                        "type": "end_quiz_now",
-                        "quiz_id": str(quiz.id)
-                    })
-
-                elif data["type"] == "submit_answer":
-                    question_id = int(data["question_id"])
-                    answer = int(data["answer"])  # Convert answer to int for comparison
-
-                    # Verify answer
-                    result = await db.execute(
-                        select(Question.correct_answer)
-                        .where(Question.id == question_id)
-                    )
-                    correct_answer = result.scalar_one()
-                    is_correct = answer == correct_answer
-
-                    if is_correct:
-                        # Get question score
-                        result = await db.execute(
-                            select(Question.score)
-                            .where(Question.id == question_id)
-                        )
-                        question_score = result.scalar_one()
-
-                        # Update score
-                        await db.execute(
-                            QuizParticipantScore.__table__.update()
-                            .where(
-                                QuizParticipantScore.quiz_id == quiz.id,
-                                QuizParticipantScore.user_id == current_user.id
-                            )
-                            .values(
-                                score=QuizParticipantScore.score + question_score
-                            )
-                        )
-                    else:
-                        # Wrong answer, no score update needed
-                        pass
-                    await db.commit()
-
-                    # Get updated leaderboard and broadcast
-                    leaderboard = await get_leaderboard(db, quiz.id)
-                    await broadcast_to_quiz(quiz_code, {
-                        "type": "leaderboard_update",
-                        "leaderboard": leaderboard,
-                        "answer_result": {
-                            "user_id": str(current_user.id),
-                            "question_id": question_id,
-                            "is_correct": is_correct
-                        }
-                    })
-
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                logger.error(f"Error handling message: {str(e)}")
-                logger.error(traceback.format_exc())
-                break
+        # Read and handle messages until the socket closes or the client leaves
+        del joined
+        ctx.quiz_id = quiz_id
+        ctx.user_id = user_id
+        ctx.host_id = host_id
+        ctx.session = session
+        await run_pipeline(ctx)
 
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
@@ -280,41 +552,149 @@ async def websocket_endpoint(websocket: WebSocket, quiz_code: str):
 
     finally:
         print("Cleaning up...")
-        if current_user and quiz and db:
+        heartbeat.unregister(websocket)
+        spectator_fanout.discard(quiz_code, websocket)
+        if user_id is not None and session is not None:
             try:
-                # Remove connection from DB
-                await db.execute(
-                    delete(QuizConnection).where(
-                        QuizConnection.quiz_id == quiz.id,
-                        QuizConnection.user_id == current_user.id
-                    )
-                )
-                
-                # Delete participant scores
-                await db.execute(
-                    delete(QuizParticipantScore).where(
-                        QuizParticipantScore.user_id == current_user.id
-                    )
-                )
-                
-                await db.commit()
-
-                # Remove from active connections
-                if quiz_code in active_connections:
-                    active_connections[quiz_code].discard(websocket)
-                    if not active_connections[quiz_code]:
-                        del active_connections[quiz_code]
-
-                # Broadcast updated participant list
-                participants = await get_quiz_participants(db, quiz.id)
-                await broadcast_to_quiz(quiz_code, {
-                    "type": "room_participants",
-                    "participants": participants
-                })
+                # Stop receiving the room's broadcasts
+                actor = room_actor(quiz_code)
+                actor.tell(actor.discard, websocket)
+
+                # Only the socket currently attached to the session may release it
+                if session and session.websocket is websocket:
+                    session.websocket = None
+                    if quiz_code in replay_buffers:
+                        session.last_seq = replay_buffers[quiz_code].last_seq
+                    if (ctx.close_code == 1000 or settings.WS_RECONNECT_GRACE <= 0) and not draining:
+                        close_session(session)
+                        await remove_participant(quiz_code, quiz_id, user_id)
+                    else:
+                        # Keep the seat and scores for a while so the client can resume
+                        session.expiry = timer_wheel.call_later(
+                            settings.WS_RECONNECT_GRACE, expire_session, session
+                        )
             except Exception as e:
                 logger.error(f"Error cleaning up: {str(e)}")
                 logger.error(traceback.format_exc())
-            finally:
-                await db.close()
 
         logger.info(f"Client disconnected from quiz {quiz_code}")
+
+def room_state(quiz_code: str) -> dict:
+    """What a monitor sees when it subscribes, from memory only"""
+    actor = room_actors.get(quiz_code)
+    room = rooms.get(quiz_code)
+    return {
+        "type": "room_state",
+        "room": quiz_code,
+        "players": len(actor.members) if actor else 0,
+        "spectators": len(spectator_fanout.spectators.get(quiz_code, ())),
+        "question": room.question_frame() if room and room.current_question_id is not None else None
+    }
+
+async def subscribe_monitor(connection: MonitorConnection, codes: List[str]):
+    codes = [code for code in dict.fromkeys(codes) if code not in connection.rooms]
+    if len(connection.rooms) + len(codes) > settings.WS_MONITOR_MAX_ROOMS:
+        monitor_hub.send(connection, {
+            "type": "error", "code": "too_many_rooms", "message_type": "subscribe",
+            "limit": settings.WS_MONITOR_MAX_ROOMS
+        })
+        return
+
+    rejected = {}
+    if codes:
+        # One lookup for the whole subscribe, none per frame afterwards
+        async with AsyncSessionLocal() as db:
+            rejected = await rejected_rooms(db, connection, codes)
+    accepted = [code for code in codes if code not in rejected]
+    monitor_hub.send(connection, {
+        "type": "subscribed",
+        "rooms": accepted,
+        "rejected": [{"room": code, "reason": reason} for code, reason in rejected.items()]
+    })
+    for code in accepted:
+        monitor_hub.subscribe(connection, code)
+        monitor_hub.send(connection, room_state(code))
+
+async def monitor_messages(connection: MonitorConnection):
+    """Receive loop for monitor sockets: subscribe, unsubscribe and heartbeats"""
+    websocket = connection.websocket
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            heartbeat.touch(websocket)
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            message_type = data.get("type") if isinstance(data, dict) else None
+            if message_type == "pong":
+                continue
+            if message_type == "ping":
+                monitor_hub.send(connection, {"type": "pong"})
+                continue
+            if message_type not in ("subscribe", "unsubscribe"):
+                monitor_hub.send(connection, {"type": "error", "code": "unknown_message", "message_type": message_type})
+                continue
+
+            try:
+                message = MonitorRooms.parse_obj(data)
+            except ValidationError as e:
+                monitor_hub.send(connection, {
+                    "type": "error", "code": "invalid_message", "message_type": message_type,
+                    "details": [
+                        {"field": ".".join(str(loc) for loc in error["loc"]), "message": error["msg"]}
+                        for error in e.errors()
+                    ]
+                })
+                continue
+
+            if message_type == "subscribe":
+                await subscribe_monitor(connection, message.rooms)
+            else:
+                for code in message.rooms:
+                    monitor_hub.unsubscribe(connection, code)
+                monitor_hub.send(connection, {"type": "unsubscribed", "rooms": message.rooms})
+    except WebSocketDisconnect:
+        return
+
+@router.websocket("/ws/monitor")
+async def monitor_endpoint(websocket: WebSocket):
+    """One socket for watching many rooms; frames carry the code of their room"""
+    connection = None
+    try:
+        token = websocket.query_params.get("token")
+        await websocket.accept()
+
+        if not token:
+            await websocket.close(code=4001, reason="No authentication token provided")
+            return
+
+        try:
+            payload = decode_access_token(token)
+            email = payload.get("sub")
+        except Exception as e:
+            logger.error(f"Token validation failed: {str(e)}")
+            await websocket.close(code=4004, reason="Token validation failed")
+            return
+
+        # Authenticated once for the socket, however many rooms it watches
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User.id).where(User.email == email))
+            user_id = result.scalar_one_or_none()
+        if user_id is None:
+            await websocket.close(code=4002, reason="User not found")
+            return
+
+        connection = MonitorConnection(websocket, user_id, email)
+        monitor_hub.add(connection)
+        heartbeat.register(websocket)
+        await monitor_messages(connection)
+
+    except Exception as e:
+        logger.error(f"Monitor websocket error: {str(e)}")
+        logger.error(traceback.format_exc())
+
+    finally:
+        heartbeat.unregister(websocket)
+        if connection is not None:
+            monitor_hub.remove(connection)
@@ -0,0 +1,94 @@
+import secrets
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Set
+from fastapi import WebSocket
+from app.core.config import settings
+from app.core.timer_wheel import TimerHandle
+
+class ReplayBuffer:
+    """Bounded ring buffer of the most recent broadcast frames of a room"""
+
+    def __init__(self, size: int):
+        self.frames: Deque[dict] = deque(maxlen=size)
+        self.last_seq = 0
+
+    def append(self, message: dict) -> dict:
+        """Stamp the message with the next sequence number and keep it"""
+        self.last_seq += 1
+        frame = {**message, "seq": self.last_seq}
+        self.frames.append(frame)
+        return frame
+
+    def since(self, seq: int) -> Optional[List[dict]]:
+        """Frames after `seq`, or None if some of them were already evicted"""
+        missed = self.last_seq - seq
+        if missed <= 0:
+            return []
+        if missed > len(self.frames):
+            return None
+        return list(islice(self.frames, len(self.frames) - missed, None))
+
+class ResumableSession:
+    """A participant's membership in a room that can outlive its socket"""
+    __slots__ = ("token", "quiz_code", "quiz_id", "user_id", "websocket", "last_seq", "expiry")
+
+    def __init__(self, token: str, quiz_code: str, quiz_id: int, user_id: int, websocket: Optional[WebSocket]):
+        self.token = token
+        self.quiz_code = quiz_code
+        self.quiz_id = quiz_id
+        self.user_id = user_id
+        self.websocket = websocket
+        self.last_seq = 0
+        self.expiry: Optional[TimerHandle] = None
+
+# resume token -> session
+sessions: Dict[str, ResumableSession] = {}
+# quiz_code -> resume tokens of its sessions (attached or parked)
+room_sessions: Dict[str, Set[str]] = {}
+# quiz_code -> recent broadcast frames
+replay_buffers: Dict[str, ReplayBuffer] = {}
+
+def get_replay_buffer(quiz_code: str) -> ReplayBuffer:
+    buffer = replay_buffers.get(quiz_code)
+    if buffer is None:
+        buffer = replay_buffers[quiz_code] = ReplayBuffer(settings.WS_REPLAY_BUFFER_SIZE)
+    return buffer
+
+def open_session(quiz_code: str, quiz_id: int, user_id: int, websocket: WebSocket) -> ResumableSession:
+    session = ResumableSession(secrets.token_urlsafe(16), quiz_code, quiz_id, user_id, websocket)
+    session.last_seq = get_replay_buffer(quiz_code).last_seq
+    sessions[session.token] = session
+    room_sessions.setdefault(quiz_code, set()).add(session.token)
+    return session
+
+def find_session(token: Optional[str], quiz_code: str, user_id: int) -> Optional[ResumableSession]:
+    """Look up a resume token, only if it belongs to this user and room"""
+    session = sessions.get(token) if token else None
+    if session and session.quiz_code == quiz_code and session.user_id == user_id:
+        return session
+    return None
+
+def user_sessions(quiz_code: str) -> Dict[int, List[ResumableSession]]:
+    """user id -> the user's sessions in a room, attached or parked"""
+    by_user: Dict[int, List[ResumableSession]] = {}
+    for token in room_sessions.get(quiz_code, ()):
+        session = sessions[token]
+        by_user.setdefault(session.user_id, []).append(session)
+    return by_user
+
+def has_session(quiz_code: str, user_id: int) -> bool:
+    return any(sessions[token].user_id == user_id for token in room_sessions.get(quiz_code, ()))
+
+def close_session(session: ResumableSession):
+    """Forget a session; the room's replay buffer goes with its last session"""
+    if session.expiry is not None:
+        session.expiry.cancel()
+        session.expiry = None
+    sessions.pop(session.token, None)
+    tokens = room_sessions.get(session.quiz_code)
+    if tokens is not None:
+        tokens.discard(session.token)
+        if not tokens:
+            del room_sessions[session.quiz_code]
+            replay_buffers.pop(session.quiz_code, None)
@@ -0,0 +1,95 @@
+import hmac
+from typing import Dict, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.permutation import KeyedPermutation
+from app.db.session import AsyncSessionLocal
+from app.models.quiz import Quiz, Question
+from app.models.quiz_session import QuizSession
+
+class SessionShuffle:
+    """Question and option orders for one run of a quiz with shuffleQuestions on.
+
+    Every order is a KeyedPermutation keyed by the quiz session and the
+    participant, so nothing is stored per participant: frames are reordered
+    as they are sent, and submitted option indexes are mapped back when
+    answers are graded.
+    """
+    __slots__ = ("session_id", "per_user_order", "option_counts")
+
+    def __init__(self, session_id: int, per_user_order: bool, option_counts: Dict[int, int]):
+        self.session_id = session_id
+        # Rooms that set the pace (timed or progressive) share one question order per session
+        self.per_user_order = per_user_order
+        self.option_counts = option_counts  # question id -> number of options
+
+    def _key(self, *parts) -> bytes:
+        message = ":".join(str(part) for part in (self.session_id,) + parts).encode()
+        return hmac.digest(settings.SECRET_KEY.encode(), message, "sha256")
+
+    def question_order(self, count: int, user_id: Optional[int] = None) -> KeyedPermutation:
+        return KeyedPermutation(self._key("questions", user_id if self.per_user_order else "room"), count)
+
+    def option_order(self, user_id: int, question_id: int, count: int) -> KeyedPermutation:
+        return KeyedPermutation(self._key("options", user_id, question_id), count)
+
+    def shown_question(self, question: dict, user_id: int) -> dict:
+        order = self.option_order(user_id, question["id"], len(question["options"]))
+        shown = {**question, "options": order.apply(question["options"])}
+        if "correctAnswer" in question:
+            shown["correctAnswer"] = order.forward(question["correctAnswer"])
+        return shown
+
+    def personalize(self, frame: dict, user_id: int) -> dict:
+        """The frame as this participant sees it; frames without questions are returned as they are"""
+        if "questions" in frame:
+            questions = frame["questions"]
+            if self.per_user_order:
+                questions = self.question_order(len(questions), user_id).apply(questions)
+            return {**frame, "questions": [self.shown_question(q, user_id) for q in questions]}
+        if "question" in frame:
+            return {**frame, "question": self.shown_question(frame["question"], user_id)}
+        return frame
+
+    def original_answer(self, user_id: int, question_id: int, shown: int) -> int:
+        """Stored index of the option a participant picked, or -1 when it is out of range"""
+        count = self.option_counts.get(question_id)
+        if count is None or not 0 <= shown < count:
+            return -1
+        return self.option_order(user_id, question_id, count).inverse(shown)
+
+# quiz_code -> shuffle for the room's running session, None when the room keeps the authored order
+shuffles: Dict[str, Optional[SessionShuffle]] = {}
+
+async def load_shuffle(db, quiz_code: str, quiz_id: int) -> Optional[SessionShuffle]:
+    """Read the quiz's settings and open session; done once per room, not per participant"""
+    result = await db.execute(select(Quiz.settings).where(Quiz.id == quiz_id))
+    quiz_settings = result.scalar_one_or_none() or {}
+    shuffle = None
+    if quiz_settings.get("shuffleQuestions"):
+        result = await db.execute(
+            select(QuizSession.id)
+            .where(QuizSession.quiz_id == quiz_id, QuizSession.ended_at.is_(None))
+            .order_by(QuizSession.id.desc())
+            .limit(1)
+        )
+        session_id = result.scalar_one_or_none()
+        if session_id is not None:
+            rows = await db.execute(select(Question.id, Question.options).where(Question.quiz_id == quiz_id))
+            paced = int(quiz_settings.get("timeLimit") or 0) > 0 or quiz_settings.get("deliveryMode") == "progressive"
+            shuffle = SessionShuffle(session_id, not paced, {row.id: len(row.options or []) for row in rows})
+    shuffles[quiz_code] = shuffle
+    return shuffle
+
+async def room_shuffle(quiz_code: str, quiz_id: int, db=None) -> Optional[SessionShuffle]:
+    """Cached shuffle for a room, loaded on first use (e.g. after a restart)"""
+    if quiz_code in shuffles:
+        return shuffles[quiz_code]
+    if db is not None:
+        return await load_shuffle(db, quiz_code, quiz_id)
+    async with AsyncSessionLocal() as db:
+        return await load_shuffle(db, quiz_code, quiz_id)
+
+def personalize(quiz_code: str, frame: dict, user_id: int) -> dict:
+    shuffle = shuffles.get(quiz_code)
+    return frame if shuffle is None else shuffle.personalize(frame, user_id)
@@ -0,0 +1,205 @@
+"""Crash-safe snapshots of live room state.
+
+The snapshot is a small binary file that is written atomically (temp file,
+fsync, rename) and read back through mmap at startup. Layout, little-endian:
+
+    header   magic "ELSQ", version, created_at, room/session/buffer counts, crc32 of body
+    rooms    code, quiz_id, time_limit, current, remaining seconds, progressive flag,
+             questions as length-prefixed JSON, answered user ids
+    sessions token, code, quiz_id, user_id, last_seq
+    buffers  code, last_seq, frames as length-prefixed JSON
+
+Scores and quiz status are not part of it, they already live in the database.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from typing import List, Tuple
+from app.core.config import settings
+from app.core.timer_wheel import timer_wheel
+from app.websocket.rooms import QuizRoom, rooms
+from app.websocket.sessions import (
+    ReplayBuffer, ResumableSession, sessions, room_sessions, replay_buffers
+)
+from app.websocket.router import advance_question, expire_session
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ELSQ"
+VERSION = 2
+HEADER = struct.Struct("<4sHHdIIII")
+ROOM = struct.Struct("<iiidIB")
+SESSION = struct.Struct("<iiQ")
+BUFFER = struct.Struct("<QI")
+STRING = struct.Struct("<H")
+FRAME = struct.Struct("<I")
+
+def _pack_str(out: bytearray, value: str):
+    data = value.encode()
+    out += STRING.pack(len(data))
+    out += data
+
+def _unpack_str(buf, offset: int) -> Tuple[str, int]:
+    (length,) = STRING.unpack_from(buf, offset)
+    offset += STRING.size
+    return bytes(buf[offset:offset + length]).decode(), offset + length
+
+def _pack_json(out: bytearray, value):
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    out += FRAME.pack(len(data))
+    out += data
+
+def _unpack_json(buf, offset: int):
+    (length,) = FRAME.unpack_from(buf, offset)
+    offset += FRAME.size
+    return json.loads(bytes(buf[offset:offset + length])), offset + length
+
+def _unpack_ints(buf, offset: int, count: int) -> Tuple[List[int], int]:
+    return list(struct.unpack_from(f"<{count}i", buf, offset)), offset + 4 * count
+
+def encode_state() -> bytes:
+    """Serialize rooms, sessions and replay buffers"""
+    now = time.monotonic()
+    body = bytearray()
+
+    for room in rooms.values():
+        remaining = max(0.0, room.deadline - now) if room.deadline is not None else 0.0
+        _pack_str(body, room.quiz_code)
+        body += ROOM.pack(room.quiz_id, room.time_limit, room.current, remaining,
+                          len(room.answered), room.progressive)
+        _pack_json(body, room.questions)
+        body += struct.pack(f"<{len(room.answered)}i", *room.answered)
+
+    for session in sessions.values():
+        # Attached clients are treated as having seen everything sent so far
+        last_seq = session.last_seq
+        if session.websocket is not None and session.quiz_code in replay_buffers:
+            last_seq = replay_buffers[session.quiz_code].last_seq
+        _pack_str(body, session.token)
+        _pack_str(body, session.quiz_code)
+        body += SESSION.pack(session.quiz_id, session.user_id, last_seq)
+
+    for quiz_code, buffer in replay_buffers.items():
+        _pack_str(body, quiz_code)
+        body += BUFFER.pack(buffer.last_seq, len(buffer.frames))
+        for frame in buffer.frames:
+            _pack_json(body, frame)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, time.time(), len(rooms), len(sessions),
+                         len(replay_buffers), zlib.crc32(body))
+    return header + bytes(body)
+
+def decode_state(buf) -> dict:
+    """Parse a snapshot buffer (bytes or mmap) without copying the whole file"""
+    magic, version, _, created_at, n_rooms, n_sessions, n_buffers, crc = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unrecognized snapshot format")
+    with memoryview(buf) as view:
+        body_crc = zlib.crc32(view[HEADER.size:])
+    if body_crc != crc:
+        raise ValueError("Snapshot checksum mismatch")
+
+    offset = HEADER.size
+    state = {"created_at": created_at, "rooms": [], "sessions": [], "buffers": []}
+
+    for _ in range(n_rooms):
+        quiz_code, offset = _unpack_str(buf, offset)
+        quiz_id, time_limit, current, remaining, n_answered, progressive = ROOM.unpack_from(buf, offset)
+        offset += ROOM.size
+        questions, offset = _unpack_json(buf, offset)
+        answered, offset = _unpack_ints(buf, offset, n_answered)
+        state["rooms"].append((quiz_code, quiz_id, time_limit, current, remaining, bool(progressive), questions, answered))
+
+    for _ in range(n_sessions):
+        token, offset = _unpack_str(buf, offset)
+        quiz_code, offset = _unpack_str(buf, offset)
+        quiz_id, user_id, last_seq = SESSION.unpack_from(buf, offset)
+        offset += SESSION.size
+        state["sessions"].append((token, quiz_code, quiz_id, user_id, last_seq))
+
+    for _ in range(n_buffers):
+        quiz_code, offset = _unpack_str(buf, offset)
+        last_seq, n_frames = BUFFER.unpack_from(buf, offset)
+        offset += BUFFER.size
+        frames = []
+        for _ in range(n_frames):
+            frame, offset = _unpack_json(buf, offset)
+            frames.append(frame)
+        state["buffers"].append((quiz_code, last_seq, frames))
+
+    return state
+
+def _write_file(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+async def write_snapshot(path: str = None):
+    """Capture state on the event loop, then write it to disk off the loop"""
+    data = encode_state()
+    await asyncio.to_thread(_write_file, path or settings.SNAPSHOT_PATH, data)
+
+def restore_snapshot(path: str = None) -> bool:
+    """Rebuild rooms, parked sessions and replay buffers from the last snapshot"""
+    path = path or settings.SNAPSHOT_PATH
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+        return False
+
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            state = decode_state(mm)
+    except Exception as e:
+        logger.error(f"Ignoring unreadable snapshot {path}: {str(e)}")
+        return False
+
+    downtime = max(0.0, time.time() - state["created_at"])
+    now = time.monotonic()
+
+    for quiz_code, last_seq, frames in state["buffers"]:
+        buffer = ReplayBuffer(settings.WS_REPLAY_BUFFER_SIZE)
+        buffer.frames = deque(frames, maxlen=settings.WS_REPLAY_BUFFER_SIZE)
+        buffer.last_seq = last_seq
+        replay_buffers[quiz_code] = buffer
+
+    # Every session comes back parked; clients reconnect with their resume token
+    for token, quiz_code, quiz_id, user_id, last_seq in state["sessions"]:
+        session = ResumableSession(token, quiz_code, quiz_id, user_id, None)
+        session.last_seq = last_seq
+        session.expiry = timer_wheel.call_later(settings.WS_RECONNECT_GRACE, expire_session, session)
+        sessions[token] = session
+        room_sessions.setdefault(quiz_code, set()).add(token)
+
+    for quiz_code, quiz_id, time_limit, current, remaining, progressive, questions, answered in state["rooms"]:
+        room = QuizRoom(quiz_code, quiz_id, questions, time_limit, progressive)
+        room.current = current
+        room.answered = set(answered)
+        remaining = max(0.0, remaining - downtime)
+        active = room.current_question_id is not None and room.timed
+        room.deadline = now + remaining if active else None
+        if active:
+            room.timer = timer_wheel.call_later(room.advance_delay(), advance_question, room)
+        rooms[quiz_code] = room
+
+    logger.info(
+        f"Restored snapshot: {len(state['rooms'])} rooms, "
+        f"{len(state['sessions'])} sessions, {len(state['buffers'])} replay buffers"
+    )
+    return True
+
+async def snapshot_loop():
+    """Periodically checkpoint live state"""
+    while True:
+        await asyncio.sleep(settings.SNAPSHOT_INTERVAL)
+        try:
+            await write_snapshot()
+        except Exception as e:
+            logger.error(f"Error writing snapshot: {str(e)}")
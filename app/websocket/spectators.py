@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+from fastapi import WebSocket, WebSocketDisconnect
+from app.core.config import settings
+from app.core.heartbeat import heartbeat
+
+logger = logging.getLogger(__name__)
+
+# Frames where only the latest one matters; spectators get at most one per tick
+COALESCED_TYPES = {"leaderboard_update", "room_participants"}
+
+class SpectatorFanout:
+    """Second broadcast tier for watch-only sockets.
+
+    Player broadcasts only hand frames over; one task delivers them to
+    spectators every `interval` seconds. Leaderboard and participant
+    frames are coalesced to the latest one, and sends run `send_batch`
+    at a time with a timeout, so a large audience neither slows down
+    player fan-out nor grows without bound.
+    """
+
+    def __init__(self, interval: float, send_batch: int, send_timeout: float):
+        self.interval = interval
+        self.send_batch = send_batch
+        self.send_timeout = send_timeout
+        # quiz_code -> spectator sockets
+        self.spectators: Dict[str, Set[WebSocket]] = {}
+        # quiz_code -> frames waiting for the next tick, in order
+        self.pending: Dict[str, List[dict]] = {}
+        self.stats = {"frames_published": 0, "frames_coalesced": 0, "frames_sent": 0, "send_failures": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, quiz_code: str, websocket: WebSocket):
+        self.spectators.setdefault(quiz_code, set()).add(websocket)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def discard(self, quiz_code: str, websocket: WebSocket):
+        connections = self.spectators.get(quiz_code)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.spectators[quiz_code]
+                self.pending.pop(quiz_code, None)
+
+    def drop(self, websocket: WebSocket):
+        """Forget a socket in whichever room it watches"""
+        for quiz_code in list(self.spectators):
+            self.discard(quiz_code, websocket)
+
+    def count(self) -> int:
+        return sum(len(connections) for connections in self.spectators.values())
+
+    def publish(self, quiz_code: str, message: dict):
+        if quiz_code not in self.spectators:
+            return
+        self.stats["frames_published"] += 1
+        frames = self.pending.setdefault(quiz_code, [])
+        if message.get("type") in COALESCED_TYPES:
+            for i, frame in enumerate(frames):
+                if frame.get("type") == message["type"]:
+                    frames[i] = message
+                    self.stats["frames_coalesced"] += 1
+                    return
+        frames.append(message)
+
+    async def _run(self):
+        while self.spectators:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in spectator fan-out: {str(e)}")
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        for quiz_code, frames in pending.items():
+            for frame in frames:
+                connections = list(self.spectators.get(quiz_code, ()))
+                text = json.dumps(frame, separators=(",", ":"), ensure_ascii=False, default=str)
+                for i in range(0, len(connections), self.send_batch):
+                    batch = connections[i:i + self.send_batch]
+                    results = await asyncio.gather(
+                        *(asyncio.wait_for(websocket.send_text(text), timeout=self.send_timeout) for websocket in batch),
+                        return_exceptions=True
+                    )
+                    failed = []
+                    for websocket, result in zip(batch, results):
+                        if isinstance(result, BaseException):
+                            self.stats["send_failures"] += 1
+                            self.discard(quiz_code, websocket)
+                            failed.append(websocket)
+                        else:
+                            self.stats["frames_sent"] += 1
+                    # Slow or gone; closing lets a live client reconnect and catch up
+                    await asyncio.gather(
+                        *(asyncio.wait_for(websocket.close(code=1013, reason="Spectator too slow"), timeout=self.send_timeout)
+                          for websocket in failed),
+                        return_exceptions=True
+                    )
+
+async def spectate(websocket: WebSocket):
+    """Receive loop for spectators: heartbeats and leave, everything else is ignored"""
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            heartbeat.touch(websocket)
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            message_type = data.get("type") if isinstance(data, dict) else None
+            if message_type == "ping":
+                await websocket.send_json({"type": "pong"})
+            elif message_type == "leave":
+                return
+    except WebSocketDisconnect:
+        return
+
+spectator_fanout = SpectatorFanout(
+    settings.WS_SPECTATOR_INTERVAL,
+    settings.WS_SPECTATOR_SEND_BATCH,
+    settings.WS_SPECTATOR_SEND_TIMEOUT
+)
@@ -0,0 +1,117 @@
+"""Memory held per idle websocket connection.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_connection_memory [connections] [num_questions]
+
+Opens `connections` fake sockets in one room, each registered the way
+websocket_endpoint registers a player (rate limiter, resumable session,
+heartbeat entry, room actor membership) and parked in run_pipeline
+waiting for a frame. tracemalloc reports the bytes allocated per socket,
+minus the fake sockets themselves, and projects it to 100k sockets.
+
+The "previous layout" run adds what every socket used to keep for its
+lifetime: an AsyncSession, its own User and Quiz (with `num_questions`
+questions loaded into that session) and two idle tasks, one reading
+frames and one processing them.
+"""
+import asyncio
+import sys
+import tracemalloc
+from datetime import datetime
+
+from app.core.heartbeat import heartbeat
+from app.core.rate_limit import ConnectionRateLimiter
+from app.db.session import AsyncSessionLocal
+from app.models.quiz import Quiz, Question
+from app.models.user import User
+# Imported so every mapper referenced by User and Quiz is configured
+from app.models.quiz_score import QuizParticipantScore  # noqa: F401
+from app.websocket.dispatch import ConnectionContext, run_pipeline
+from app.websocket.actor import room_actor, room_actors
+from app.websocket.sessions import close_session, open_session, room_sessions, sessions
+
+QUIZ_CODE = "BENCH1"
+
+class IdleWebSocket:
+    """Never sends a frame until released; stands in for a quiet client"""
+
+    def __init__(self, released: asyncio.Event):
+        self.released = released
+
+    async def receive(self) -> dict:
+        await self.released.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_json(self, data):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+def make_orm(user_id: int, num_questions: int):
+    user = User(id=user_id, email=f"player{user_id}@example.com", hashed_password="x" * 60)
+    quiz = Quiz(
+        id=1, code=QUIZ_CODE, title="Benchmark quiz", description="A quiz",
+        created_at=datetime.utcnow(), created_by_id=1, status="active",
+        settings={"timeLimit": 30, "shuffleQuestions": False, "deliveryMode": "bulk"}
+    )
+    quiz.questions = [
+        Question(id=i, quiz_id=1, text=f"Question number {i}?",
+                 options=[f"Option {j} for question {i}" for j in range(4)],
+                 correct_answer=i % 4, score=10, order=i)
+        for i in range(num_questions)
+    ]
+    return user, quiz
+
+async def measure(count: int, num_questions: int, previous: bool) -> float:
+    released = asyncio.Event()
+    # Fake sockets are allocated up front and not charged to the server
+    websockets = [IdleWebSocket(released) for _ in range(count)]
+    held = []
+    tasks = []
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    for user_id, websocket in enumerate(websockets, start=1):
+        ctx = ConnectionContext(websocket, sys.intern(QUIZ_CODE), ConnectionRateLimiter())
+        ctx.quiz_id = 1
+        ctx.user_id = user_id
+        ctx.session = open_session(ctx.quiz_code, 1, user_id, websocket)
+        room_actor(ctx.quiz_code).add(websocket, user_id)
+        heartbeat.last_seen[websocket] = 0.0  # register() without starting the sweeper
+        if previous:
+            db = AsyncSessionLocal()
+            user, quiz = make_orm(user_id, num_questions)
+            db.add_all([user, quiz])
+            held.append((db, user, quiz))
+            tasks.append(asyncio.ensure_future(released.wait()))
+            tasks.append(asyncio.ensure_future(released.wait()))
+        tasks.append(asyncio.ensure_future(run_pipeline(ctx)))
+    # Let every connection park in receive()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    used = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    tracemalloc.stop()
+
+    released.set()
+    await asyncio.gather(*tasks)
+    for websocket in websockets:
+        heartbeat.unregister(websocket)
+    for token in list(room_sessions.get(QUIZ_CODE, ())):
+        close_session(sessions[token])
+    room_actors.pop(QUIZ_CODE, None)
+    for db, _, _ in held:
+        db.expunge_all()
+    return sum(stat.size_diff for stat in used) / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    num_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"{count} idle connections, quiz with {num_questions} questions")
+    for name, previous in (("previous layout", True), ("compact record", False)):
+        per_socket = asyncio.run(measure(count, num_questions, previous))
+        print(f"{name:<16} {per_socket:>10.0f} B/connection  {per_socket * 100_000 / 2 ** 20:>8.1f} MiB per 100k")
+
+if __name__ == "__main__":
+    main()
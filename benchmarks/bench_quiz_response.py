@@ -0,0 +1,73 @@
+"""Compare the old and new encoding paths for quiz responses.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_quiz_response [num_questions] [iterations]
+
+The old path is what FastAPI did for a hand-built dict with
+response_model=QuizSchema: validate into the model, run jsonable_encoder,
+then json.dumps. The new paths use app.core.responses.
+"""
+import json
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.responses import dumps, serialize_quiz, ResponseCache
+from app.schemas.quiz import Quiz as QuizSchema
+
+def make_quiz(num_questions: int):
+    quiz = SimpleNamespace(
+        id=1, code="ABC123", created_at=datetime.utcnow(), created_by_id=7,
+        title="Benchmark quiz", description="A large quiz", status="idle",
+        settings={"timeLimit": 30, "shuffleQuestions": False, "deliveryMode": "bulk"}
+    )
+    questions = [
+        SimpleNamespace(
+            id=i, text=f"Question number {i}?",
+            options=[f"Option {j} for question {i}" for j in range(4)],
+            correct_answer=i % 4, score=10
+        )
+        for i in range(num_questions)
+    ]
+    return quiz, questions
+
+def old_path(payload: dict) -> bytes:
+    model = QuizSchema(**payload)
+    content = jsonable_encoder(model)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def bench(name: str, fn, iterations: int):
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed / iterations * 1e6:>10.1f} us/request")
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    quiz, questions = make_quiz(num_questions)
+
+    settings.VALIDATE_RESPONSES = False
+    cache = ResponseCache(16)
+    version = cache.version()
+    payload = serialize_quiz(quiz, "teacher@example.com", questions)
+    cache.set(quiz.code, dumps(payload), version)
+
+    print(f"{num_questions} questions, {len(dumps(payload))} bytes")
+    bench("old: validate + jsonable_encoder", lambda: old_path(payload), iterations)
+
+    settings.VALIDATE_RESPONSES = True
+    bench("new: validate once + encode", lambda: dumps(serialize_quiz(quiz, "teacher@example.com", questions)), iterations)
+
+    settings.VALIDATE_RESPONSES = False
+    bench("new: no validation + encode", lambda: dumps(serialize_quiz(quiz, "teacher@example.com", questions)), iterations)
+    bench("new: cached bytes", lambda: cache.get(quiz.code), iterations)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Throughput and ordering of room broadcasts: shared set vs room actor.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_room_actor [members] [producers] [broadcasts_each]
+
+`producers` coroutines each broadcast `broadcasts_each` frames to one room
+of `members` fake sockets while another coroutine keeps joining and
+leaving. Fake sockets yield to the event loop on every send, as a real
+transport may, and one send in a hundred stalls for a millisecond.
+
+The shared-set run uses the previous broadcast_to_quiz: stamp the frame
+from the replay buffer, then send it to a copy of the member set. The
+actor run sends the same commands to a RoomActor. For both, the script
+reports frames delivered per second and how many frames reached a socket
+after a frame with a higher sequence number. Last, it times a no-op
+command through call() and tell() against a plain function call.
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+
+from app.websocket.actor import RoomActor, room_actor, room_actors
+from app.websocket.sessions import ReplayBuffer, get_replay_buffer, replay_buffers, room_sessions
+
+QUIZ_CODE = "BENCH1"
+# Same stalls for both runs
+stalls = random.Random(46)
+
+class FakeWebSocket:
+    def __init__(self):
+        self.last_seq = 0
+        self.received = 0
+        self.out_of_order = 0
+
+    async def send_text(self, text: str):
+        # Mostly a yield; now and then a full socket buffer stalls the send
+        await asyncio.sleep(0.001 if stalls.random() < 0.01 else 0)
+        seq = json.loads(text)["seq"]
+        if seq < self.last_seq:
+            self.out_of_order += 1
+        self.last_seq = max(self.last_seq, seq)
+        self.received += 1
+
+    async def send_json(self, data):
+        pass
+
+async def shared_set_broadcast(members: set, buffer: ReplayBuffer, message: dict):
+    """The previous broadcast_to_quiz"""
+    message = buffer.append(message)
+    text = json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+    for websocket in list(members):
+        try:
+            await websocket.send_text(text)
+        except Exception:
+            pass
+
+async def churn(join, leave, stop: asyncio.Event):
+    """Keep a socket joining and leaving while the broadcasts run"""
+    while not stop.is_set():
+        websocket = FakeWebSocket()
+        await join(websocket)
+        await asyncio.sleep(0)
+        await leave(websocket)
+
+def reset_room():
+    room_actors.pop(QUIZ_CODE, None)
+    replay_buffers.pop(QUIZ_CODE, None)
+    room_sessions[QUIZ_CODE] = {"bench"}  # Broadcasts are stamped only for rooms with sessions
+
+async def run(name: str, member_count: int, producers: int, each: int, use_actor: bool):
+    reset_room()
+    websockets = [FakeWebSocket() for _ in range(member_count)]
+    stop = asyncio.Event()
+
+    if use_actor:
+        actor = room_actor(QUIZ_CODE)
+        for user_id, websocket in enumerate(websockets):
+            actor.add(websocket, user_id)
+
+        async def broadcast(message):
+            await actor.call(actor.broadcast, message)
+
+        async def join(websocket):
+            await actor.call(actor.add, websocket, -1)
+
+        async def leave(websocket):
+            actor.tell(actor.discard, websocket)
+    else:
+        members = set(websockets)
+        buffer = get_replay_buffer(QUIZ_CODE)
+
+        async def broadcast(message):
+            await shared_set_broadcast(members, buffer, message)
+
+        async def join(websocket):
+            members.add(websocket)
+
+        async def leave(websocket):
+            members.discard(websocket)
+
+    async def producer(index: int):
+        for i in range(each):
+            await broadcast({"type": "leaderboard_update", "producer": index, "i": i})
+
+    churner = asyncio.ensure_future(churn(join, leave, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(index) for index in range(producers)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await churner
+
+    delivered = sum(websocket.received for websocket in websockets)
+    out_of_order = sum(websocket.out_of_order for websocket in websockets)
+    print(f"{name:<12} {producers * each / elapsed:>10.0f} broadcasts/s  {delivered / elapsed:>12.0f} frames/s  "
+          f"{out_of_order:>8} out of order")
+
+async def command_overhead(iterations: int):
+    reset_room()
+    actor = RoomActor(QUIZ_CODE)
+    room_actors[QUIZ_CODE] = actor
+
+    def noop():
+        return None
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        noop()
+    print(f"{'direct call':<12} {(time.perf_counter() - start) / iterations * 1e6:>10.2f} us/command")
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await actor.call(noop)
+    print(f"{'call()':<12} {(time.perf_counter() - start) / iterations * 1e6:>10.2f} us/command")
+
+    done = asyncio.Event()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        actor.tell(noop)
+    actor.tell(done.set)
+    await done.wait()
+    print(f"{'tell()':<12} {(time.perf_counter() - start) / iterations * 1e6:>10.2f} us/command")
+
+def main():
+    member_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    producers = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    each = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    print(f"{member_count} members, {producers} producers x {each} broadcasts, with join/leave churn")
+    asyncio.run(run("shared set", member_count, producers, each, use_actor=False))
+    asyncio.run(run("room actor", member_count, producers, each, use_actor=True))
+    print()
+    asyncio.run(command_overhead(50000))
+    room_sessions.pop(QUIZ_CODE, None)
+
+if __name__ == "__main__":
+    main()
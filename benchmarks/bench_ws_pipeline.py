@@ -0,0 +1,135 @@
+"""Latency of websocket message dispatch and of the pipelined receive loop.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_ws_pipeline [messages] [interval_ms] [handler_ms]
+
+Part one compares the old if/elif chain on raw dicts with the handler
+registry plus typed decoding. Part two sends `messages` frames
+`interval_ms` apart to a fake socket whose handler takes `handler_ms`
+(standing in for a commit). It runs them through the old serial
+receive-then-handle loop and through run_pipeline, and reports how long
+frames waited to be read and to be handled.
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.rate_limit import ConnectionRateLimiter
+from app.schemas.websocket import EmptyMessage, SubmitAnswer
+from app.websocket.dispatch import ConnectionContext, dispatch, handler, run_pipeline
+
+class Unlimited(ConnectionRateLimiter):
+    limits = {}
+
+class Timed(BaseModel):
+    seq: int
+
+handled_at = {}
+handler_delay = 0.0
+
+@handler("bench_noop", EmptyMessage)
+async def on_noop(ctx, message):
+    pass
+
+@handler("bench_answer", SubmitAnswer)
+async def on_answer(ctx, message):
+    pass
+
+@handler("bench_commit", Timed)
+async def on_commit(ctx, message):
+    await asyncio.sleep(handler_delay)
+    handled_at[message.seq] = time.perf_counter()
+
+class FakeWebSocket:
+    """Delivers frames at fixed arrival times and discards everything sent"""
+
+    def __init__(self, count: int, interval: float):
+        start = time.perf_counter()
+        self.arrivals = [start + i * interval for i in range(count)]
+        self.read_delays = []
+        self.next = 0
+
+    async def receive(self) -> dict:
+        if self.next == len(self.arrivals):
+            return {"type": "websocket.disconnect", "code": 1000}
+        arrival = self.arrivals[self.next]
+        wait = arrival - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self.read_delays.append(time.perf_counter() - arrival)
+        frame = json.dumps({"type": "bench_commit", "seq": self.next})
+        self.next += 1
+        return {"type": "websocket.receive", "text": frame}
+
+    async def send_json(self, data):
+        pass
+
+async def serial_loop(ctx: ConnectionContext):
+    """The old shape: read one frame, run its handler to completion, read the next"""
+    while True:
+        message = await ctx.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        await dispatch(ctx, json.loads(message["text"]))
+
+def old_chain(data: dict):
+    if data["type"] == "start_quiz":
+        pass
+    elif data["type"] == "end_quiz":
+        pass
+    elif data["type"] == "next_question":
+        pass
+    elif data["type"] == "leave":
+        pass
+    elif data["type"] == "submit_answer":
+        int(data["question_id"])
+        int(data["answer"])
+
+async def bench_dispatch(iterations: int):
+    ctx = ConnectionContext(FakeWebSocket(0, 0), "BENCH", Unlimited())
+    answer = {"type": "submit_answer", "question_id": "12", "answer": 2}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        old_chain(answer)
+    print(f"{'if/elif chain, raw dict':<36} {(time.perf_counter() - start) / iterations * 1e6:>8.2f} us/message")
+
+    for message in ({"type": "bench_noop"}, {"type": "bench_answer", "question_id": "12", "answer": 2}):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await dispatch(ctx, message)
+        label = f"registry + decode ({message['type']})"
+        print(f"{label:<36} {(time.perf_counter() - start) / iterations * 1e6:>8.2f} us/message")
+
+def report(name: str, websocket: FakeWebSocket):
+    read = sorted(websocket.read_delays)
+    done = sorted(handled_at[i] - arrival for i, arrival in enumerate(websocket.arrivals))
+    p99 = lambda values: values[min(len(values) - 1, int(len(values) * 0.99))]
+    print(f"{name:<10} read wait  p50 {statistics.median(read) * 1000:>8.2f} ms  p99 {p99(read) * 1000:>8.2f} ms")
+    print(f"{'':<10} handled    p50 {statistics.median(done) * 1000:>8.2f} ms  p99 {p99(done) * 1000:>8.2f} ms")
+
+async def bench_pipeline(count: int, interval: float):
+    for name, run in (("serial", serial_loop), ("pipelined", run_pipeline)):
+        handled_at.clear()
+        websocket = FakeWebSocket(count, interval)
+        await run(ConnectionContext(websocket, "BENCH", Unlimited()))
+        report(name, websocket)
+
+def main():
+    global handler_delay
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    interval = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    handler_delay = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.010
+    # Let the whole burst queue up instead of measuring queue_full refusals
+    settings.WS_MESSAGE_QUEUE_SIZE = max(settings.WS_MESSAGE_QUEUE_SIZE, count)
+
+    asyncio.run(bench_dispatch(20000))
+    print(f"\n{count} frames every {interval * 1000:.1f} ms, handler takes {handler_delay * 1000:.1f} ms")
+    asyncio.run(bench_pipeline(count, interval))
+
+if __name__ == "__main__":
+    main()
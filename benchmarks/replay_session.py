@@ -0,0 +1,210 @@
+"""Replay a recorded quiz session against a running server and report latency.
+
+Usage (from the repository root):
+    python -m benchmarks.replay_session RECORDING [--url ws://localhost:8002]
+        [--speed N] [--quiz OLD=NEW ...] [--out results.json] [--compare baseline.json]
+
+RECORDING is an NDJSON file written by the server with WS_RECORD_PATH set
+(app/core/recorder.py). Every recorded connection is opened again and its
+client frames are sent on the recorded schedule, divided by --speed
+(1 = real time, 10 = ten times faster). Sending is open loop: a slow
+server does not slow the replay down, just as real clients would not wait.
+
+Latency is the time from sending a client frame to the next frame the
+server sends on that connection, grouped by the client frame's type.
+--out writes the summary as JSON. --compare prints it next to an earlier
+summary, so two builds can be replayed with the same recording and
+compared.
+
+Tokens are minted with this checkout's SECRET_KEY for the recorded users,
+so the target server must share that key. Its database must hold the
+recorded users and quizzes; --quiz maps a recorded room code to another
+one. Resume tokens are not recorded, so a reconnect is replayed as a fresh
+join.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import Dict, List
+from urllib.parse import urlencode
+
+import websockets
+
+from app.core.security import create_access_token
+
+class RecordedConnection:
+    def __init__(self, conn: int, opened_at: float, quiz_code: str, user: str, params: dict):
+        self.conn = conn
+        self.opened_at = opened_at
+        self.quiz_code = quiz_code
+        self.user = user
+        self.params = params
+        self.inbound: List[tuple] = []  # (t, raw frame) sent by the client
+        self.outbound = 0  # frames the server sent in the recording
+        self.closed_at = None
+
+def load_recording(path: str) -> List[RecordedConnection]:
+    connections: Dict[int, RecordedConnection] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            conn = entry["conn"]
+            if entry["dir"] == "open":
+                connections[conn] = RecordedConnection(
+                    conn, entry["t"], entry["quiz"], entry["user"], entry.get("params", {})
+                )
+                continue
+            recorded = connections.get(conn)
+            if recorded is None:
+                continue
+            if entry["dir"] == "in":
+                recorded.inbound.append((entry["t"], entry["frame"]))
+            elif entry["dir"] == "out":
+                recorded.outbound += 1
+            elif entry["dir"] == "close" and recorded.closed_at is None:
+                recorded.closed_at = entry["t"]
+    return sorted(connections.values(), key=lambda recorded: recorded.opened_at)
+
+def frame_type(raw: str) -> str:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return "invalid"
+    return data.get("type", "unknown") if isinstance(data, dict) else "invalid"
+
+class Replay:
+    def __init__(self, url: str, speed: float, quiz_map: Dict[str, str]):
+        self.url = url.rstrip("/")
+        self.speed = speed
+        self.quiz_map = quiz_map
+        self.latencies: Dict[str, List[float]] = {}
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.failed_connections = 0
+        self.start = 0.0
+
+    async def wait_until(self, recorded_t: float, origin: float):
+        delay = self.start + (recorded_t - origin) / self.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def run_connection(self, recorded: RecordedConnection, origin: float):
+        await self.wait_until(recorded.opened_at, origin)
+        token = create_access_token({"sub": recorded.user}, timedelta(hours=12))
+        quiz_code = self.quiz_map.get(recorded.quiz_code, recorded.quiz_code)
+        query = urlencode({**recorded.params, "token": token})
+        # Client frames awaiting their first server frame: (type, sent at)
+        waiting: List[tuple] = []
+
+        async def receive(websocket):
+            async for _ in websocket:
+                now = time.perf_counter()
+                self.frames_received += 1
+                for message_type, sent_at in waiting:
+                    self.latencies.setdefault(message_type, []).append(now - sent_at)
+                waiting.clear()
+
+        try:
+            async with websockets.connect(f"{self.url}/ws/quiz/{quiz_code}?{query}", max_size=None) as websocket:
+                receiver = asyncio.ensure_future(receive(websocket))
+                for t, raw in recorded.inbound:
+                    await self.wait_until(t, origin)
+                    if receiver.done():
+                        break
+                    waiting.append((frame_type(raw), time.perf_counter()))
+                    await websocket.send(raw)
+                    self.frames_sent += 1
+                if recorded.closed_at is not None:
+                    await self.wait_until(recorded.closed_at, origin)
+                else:
+                    # Still open when the recording ended: give the last replies a moment
+                    await asyncio.sleep(1)
+                receiver.cancel()
+        except Exception as e:
+            self.failed_connections += 1
+            print(f"connection {recorded.conn} ({recorded.user} in {quiz_code}) failed: {e}")
+
+    async def run(self, connections: List[RecordedConnection]):
+        origin = connections[0].opened_at
+        self.start = time.perf_counter()
+        await asyncio.gather(*(self.run_connection(recorded, origin) for recorded in connections))
+        return time.perf_counter() - self.start
+
+def percentile(values: List[float], fraction: float) -> float:
+    """`values` must be sorted"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def summarize(replay: Replay, connections: List[RecordedConnection], elapsed: float) -> dict:
+    latency = {message_type: sorted(values) for message_type, values in replay.latencies.items()}
+    if latency:
+        latency["all"] = sorted(value for values in latency.values() for value in values)
+    return {
+        "speed": replay.speed,
+        "elapsed_s": round(elapsed, 3),
+        "connections": len(connections),
+        "failed_connections": replay.failed_connections,
+        "frames_sent": replay.frames_sent,
+        "frames_received": replay.frames_received,
+        "frames_recorded_out": sum(recorded.outbound for recorded in connections),
+        "latency_ms": {
+            message_type: {
+                "count": len(values),
+                "p50": round(percentile(values, 0.50) * 1000, 3),
+                "p90": round(percentile(values, 0.90) * 1000, 3),
+                "p99": round(percentile(values, 0.99) * 1000, 3),
+                "max": round(values[-1] * 1000, 3)
+            }
+            for message_type, values in sorted(latency.items())
+        }
+    }
+
+def print_summary(summary: dict, baseline: dict = None):
+    print(f"{summary['connections']} connections ({summary['failed_connections']} failed) at {summary['speed']}x "
+          f"in {summary['elapsed_s']} s; {summary['frames_sent']} frames sent, "
+          f"{summary['frames_received']} received ({summary['frames_recorded_out']} in the recording)")
+    header = f"{'type':<18} {'count':>7} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10}"
+    if baseline:
+        header += f"  {'p50 vs base':>12} {'p99 vs base':>12}"
+    print(header)
+    for message_type, stats in summary["latency_ms"].items():
+        row = (f"{message_type:<18} {stats['count']:>7} {stats['p50']:>10.2f} {stats['p90']:>10.2f} "
+               f"{stats['p99']:>10.2f} {stats['max']:>10.2f}")
+        before = baseline["latency_ms"].get(message_type) if baseline else None
+        if before:
+            change = lambda key: f"{(stats[key] - before[key]) / before[key] * 100:+.1f}%" if before[key] else "n/a"
+            row += f"  {change('p50'):>12} {change('p99'):>12}"
+        print(row)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded quiz session")
+    parser.add_argument("recording")
+    parser.add_argument("--url", default="ws://localhost:8002")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--quiz", action="append", default=[], metavar="OLD=NEW")
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    connections = load_recording(args.recording)
+    if not connections:
+        print("No connections in the recording")
+        return
+    replay = Replay(args.url, args.speed, dict(mapping.split("=", 1) for mapping in args.quiz))
+    elapsed = asyncio.run(replay.run(connections))
+    summary = summarize(replay, connections, elapsed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
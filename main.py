@@ -1,9 +1,15 @@
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, quiz
+from app.routes import auth, quiz, analytics, metrics, export, profiling, profile
 from app.websocket import router as websocket_router
+from app.websocket.router import drain_connections
+from app.websocket.snapshot import restore_snapshot, write_snapshot, snapshot_loop
+import asyncio
 from app.core.config import settings
+from app.core.answer_log import answer_log
+from app.core.profiling import TimingMiddleware, spans
+from app.core.recorder import frame_recorder
 
 app = FastAPI(title="Elsa API")
 
@@ -16,11 +22,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Timing span per route
+app.add_middleware(TimingMiddleware, recorder=spans)
+
 # Include routers
 app.include_router(auth.router, prefix="/api", tags=["auth"])
 app.include_router(quiz.router, prefix="/api", tags=["quiz"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(export.router, prefix="/api", tags=["export"])
+app.include_router(profile.router, prefix="/api", tags=["profile"])
+app.include_router(profiling.router, prefix="/api", tags=["admin"])
 app.include_router(websocket_router, tags=["websocket"])
 
+snapshot_task = None
+
+@app.on_event("startup")
+async def startup():
+    global snapshot_task
+    # Bring back rooms and resumable sessions before accepting sockets
+    restore_snapshot()
+    snapshot_task = asyncio.create_task(snapshot_loop())
+
+@app.on_event("shutdown")
+async def shutdown():
+    if snapshot_task:
+        snapshot_task.cancel()
+    # Close remaining sockets and write a final snapshot for the next process
+    await drain_connections()
+    await write_snapshot()
+    # Write any answers still buffered in memory
+    await answer_log.close()
+    await frame_recorder.close()
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base_class import Base
+from app.models.quiz import Quiz
+from app.models.quiz_score import QuizParticipantScore
+from app.models.quiz_session import QuizSession, QuizSessionScore
+from app.models.user import User
+from app.websocket.queries import archive_session
+
+def archive(tmp_path, scores):
+    """Archive quiz 1 with the given {user_id: score}; returns (player ids, sessions, archived scores)"""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'archive.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(User), [
+                {"id": user_id, "email": f"user{user_id}@example.com", "hashed_password": "x"}
+                for user_id in (1, 2, 3)
+            ])
+            await conn.execute(insert(Quiz), [{"id": 1, "code": "ABC123", "title": "Quiz", "created_by_id": 1}])
+            if scores:
+                await conn.execute(insert(QuizParticipantScore), [
+                    {"quiz_id": 1, "user_id": user_id, "score": score} for user_id, score in scores.items()
+                ])
+
+        async with AsyncSession(engine) as db:
+            player_ids = await archive_session(db, 1)
+            await db.commit()
+            sessions = (await db.execute(select(func.count()).select_from(QuizSession))).scalar_one()
+            archived = (await db.execute(
+                select(QuizSessionScore.user_id, QuizSessionScore.rank).order_by(QuizSessionScore.user_id)
+            )).all()
+        await engine.dispose()
+        return player_ids, sessions, archived
+    return asyncio.run(run())
+
+def test_nothing_played_records_no_session(tmp_path):
+    assert archive(tmp_path, {}) == ([], 0, [])
+
+def test_untracked_session_is_archived_with_ranks(tmp_path):
+    player_ids, sessions, archived = archive(tmp_path, {1: 20, 2: 30, 3: 20})
+    assert sorted(player_ids) == [1, 2, 3]
+    assert sessions == 1
+    assert [tuple(row) for row in archived] == [(1, 2), (2, 1), (3, 2)]
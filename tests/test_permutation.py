@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.permutation import KeyedPermutation
+from app.websocket.shuffle import SessionShuffle
+
+QUESTION = {"id": 5, "text": "Pick the prime", "options": ["4", "6", "7", "8", "9"], "correctAnswer": 2, "score": 10}
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 4, 5, 7, 8, 16, 17, 100, 257])
+def test_bijection(n):
+    permutation = KeyedPermutation(b"key", n)
+    positions = [permutation.forward(index) for index in range(n)]
+    assert sorted(positions) == list(range(n))
+    assert [permutation.inverse(position) for position in positions] == list(range(n))
+
+def test_apply_matches_forward():
+    items = [f"item{i}" for i in range(20)]
+    permutation = KeyedPermutation(b"key", len(items))
+    shown = permutation.apply(items)
+    assert sorted(shown) == sorted(items)
+    for index, item in enumerate(items):
+        assert shown[permutation.forward(index)] == item
+
+def test_deterministic_per_key():
+    items = list(range(50))
+    assert KeyedPermutation(b"key", 50).apply(items) == KeyedPermutation(b"key", 50).apply(items)
+    assert KeyedPermutation(b"key", 50).apply(items) != KeyedPermutation(b"other", 50).apply(items)
+
+def test_answer_remapping_round_trips():
+    shuffle = SessionShuffle(1, per_user_order=True, option_counts={QUESTION["id"]: len(QUESTION["options"])})
+    for user_id in range(1, 20):
+        shown = shuffle.shown_question(QUESTION, user_id)
+        assert shown["options"][shown["correctAnswer"]] == "7"
+        # Every option the participant can pick maps back to the same option as authored
+        for position, option in enumerate(shown["options"]):
+            assert QUESTION["options"][shuffle.original_answer(user_id, QUESTION["id"], position)] == option
+        assert shuffle.original_answer(user_id, QUESTION["id"], shown["correctAnswer"]) == QUESTION["correctAnswer"]
+
+def test_out_of_range_answer_is_rejected():
+    shuffle = SessionShuffle(1, per_user_order=True, option_counts={QUESTION["id"]: len(QUESTION["options"])})
+    assert shuffle.original_answer(1, QUESTION["id"], len(QUESTION["options"])) == -1
+    assert shuffle.original_answer(1, QUESTION["id"], -1) == -1
+    assert shuffle.original_answer(1, 999, 0) == -1
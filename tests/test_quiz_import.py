@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from app.core.quiz_import import ImportParseError, iter_csv, iter_ndjson
+
+def upload(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode())
+
+CSV = (
+    "quiz,title,time_limit,shuffle_questions,delivery_mode,text,options,correct_answer,score\n"
+    "q1,Capitals,30,true,progressive,Capital of France?,Paris|Lyon,0,10\n"
+    "q1,Capitals,30,true,progressive,Capital of Spain?,Porto|Madrid,1,\n"
+    "q2,Sums,0,false,,2 + 2?,3|4|5,1,5\n"
+)
+
+def test_csv_groups_rows_into_quizzes():
+    items = list(iter_csv(upload(CSV)))
+    assert [line for line, _ in items] == [2, 4]
+    first, second = items[0][1], items[1][1]
+    assert first["settings"] == {"timeLimit": "30", "shuffleQuestions": True, "deliveryMode": "progressive"}
+    assert [q["options"] for q in first["questions"]] == [["Paris", "Lyon"], ["Porto", "Madrid"]]
+    assert "score" not in first["questions"][1]
+    assert second["settings"]["deliveryMode"] == "bulk"
+
+def test_csv_optional_columns_may_be_left_out():
+    [(_, quiz)] = iter_csv(upload("title,text,options,correct_answer\nQuiz,Q?,A|B,0\n"))
+    assert quiz["settings"] == {"timeLimit": 0, "shuffleQuestions": False, "deliveryMode": "bulk"}
+
+@pytest.mark.parametrize("header, problem", [
+    ("title,text,options\n", "missing columns ['correct_answer']"),
+    ("title,text,options,correct_answer,colour\n", "unknown columns ['colour']"),
+])
+def test_csv_header_is_checked(header, problem):
+    with pytest.raises(ImportParseError) as error:
+        list(iter_csv(upload(header + "Quiz,Q?,A|B,0\n")))
+    assert problem in str(error.value)
+    assert error.value.line == 1
+
+def test_empty_csv_is_rejected():
+    with pytest.raises(ImportParseError, match="header"):
+        list(iter_csv(upload("")))
+
+def test_csv_decode_error_has_line():
+    data = "title,text,options,correct_answer\nQuiz,Q?,A|B,0\n".encode() + b"Quiz,\xff\xfe,A|B,0\n"
+    with pytest.raises(ImportParseError) as error:
+        list(iter_csv(io.BytesIO(data)))
+    assert error.value.line == 3
+
+def test_csv_quoted_field_spans_lines():
+    items = list(iter_csv(upload('title,text,options,correct_answer\nQuiz,"Line one\nline two",A|B,0\n')))
+    assert items[0][1]["questions"][0]["text"] == "Line one\nline two"
+
+def test_ndjson_lines():
+    items = list(iter_ndjson(upload('{"title": "A"}\n\nnot json\n')))
+    assert items[0] == (1, {"title": "A"})
+    assert items[1][0] == 3
+    assert isinstance(items[1][1], ValueError)
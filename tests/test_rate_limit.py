@@ -0,0 +1,93 @@
+import types
+
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import ConnectionRateLimiter, TokenBucket, parse_rate_limits
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+@pytest.fixture
+def limiter(monkeypatch, clock):
+    monkeypatch.setattr(ConnectionRateLimiter, "limits", parse_rate_limits("default:2:4,submit_answer:1:2"))
+    return ConnectionRateLimiter()
+
+def take(bucket: TokenBucket) -> float:
+    retry_after = bucket.wait()
+    if not retry_after:
+        bucket.take()
+    return retry_after
+
+def test_bucket_starts_full_then_rejects(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [take(bucket) for _ in range(3)] == [0, 0, 0]
+    assert take(bucket) == pytest.approx(0.5)
+
+def test_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        take(bucket)
+    clock.advance(0.25)
+    assert take(bucket) == pytest.approx(0.25)  # Half a token so far
+    clock.advance(0.25)
+    assert take(bucket) == 0
+    assert take(bucket) == pytest.approx(0.5)
+
+def test_bucket_refill_is_capped(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    take(bucket)
+    clock.advance(60)
+    assert [take(bucket) for _ in range(4)][-1] > 0
+
+def test_wait_takes_nothing(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.wait() == 0
+    assert bucket.wait() == 0
+    assert take(bucket) == 0
+    assert take(bucket) == pytest.approx(1)
+
+def test_limited_type_is_rejected_by_its_own_bucket(limiter):
+    assert limiter.check("submit_answer") == 0
+    assert limiter.check("submit_answer") == 0
+    assert limiter.check("submit_answer") == pytest.approx(1)
+
+def test_rejected_message_does_not_drain_shared_bucket(limiter):
+    limiter.check("submit_answer")
+    limiter.check("submit_answer")
+    # Retrying the limited type keeps failing without touching the default bucket
+    for _ in range(10):
+        assert limiter.check("submit_answer") > 0
+    # Default burst 4, two used by the admitted answers
+    assert [limiter.check("join") for _ in range(3)] == [0, 0, pytest.approx(0.5)]
+
+def test_limiter_refills(limiter, clock):
+    for _ in range(4):
+        assert limiter.check("join") == 0
+    assert limiter.check("join") == pytest.approx(0.5)
+    clock.advance(0.5)
+    assert limiter.check("join") == 0
+
+@pytest.mark.parametrize("spec", ["x:0:5", "x:-1:5", "x:1:0.5"])
+def test_parse_rejects_invalid_limits(spec):
+    with pytest.raises(ValueError):
+        parse_rate_limits(spec)
+
+def test_parse_limits():
+    assert parse_rate_limits(" default:20:40, submit_answer:1:5 ,") == {
+        "default": (20.0, 40.0),
+        "submit_answer": (1.0, 5.0)
+    }
@@ -0,0 +1,99 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.base_class import Base
+from app.models.quiz import Quiz, Question
+from app.models.quiz_score import QuizParticipantScore  # noqa: F401 (mapped by Quiz relationships)
+from app.models.user import User
+from app.routes.quiz import create_quiz, import_quizzes
+from app.schemas.quiz import QuizCreate
+
+USER = SimpleNamespace(id=1, email="teacher@example.com")
+TABLES = [User.__table__, Quiz.__table__, Question.__table__]
+
+def quiz_data(title: str) -> dict:
+    return {
+        "title": title,
+        "settings": {"timeLimit": 0, "shuffleQuestions": False},
+        "questions": [{"text": "2 + 2?", "options": ["3", "4"], "correctAnswer": 1}]
+    }
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """A primary and a replica in two SQLite files; the replica never receives the primary's writes"""
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=NullPool)
+        db_session.configure_sqlite(engine)
+        engines[name] = engine
+
+    async def setup():
+        for engine in engines.values():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+                await conn.execute(insert(User), [{"id": USER.id, "email": USER.email, "hashed_password": "x"}])
+    asyncio.run(setup())
+
+    monkeypatch.setattr(db_session, "engine", engines["primary"])
+    monkeypatch.setattr(db_session, "read_engine", engines["replica"])
+    monkeypatch.setattr(db_session, "AsyncSessionLocal",
+                        sessionmaker(engines["primary"], class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(db_session, "AsyncReadSessionLocal",
+                        sessionmaker(engines["replica"], class_=AsyncSession, expire_on_commit=False))
+    db_session.recent_writes.clear()
+    yield engines
+    db_session.recent_writes.clear()
+
+async def read_quiz(key, code: str):
+    async with db_session.read_session_for(key)() as db:
+        result = await db.execute(select(Quiz.code).where(Quiz.code == code))
+        return result.scalar_one_or_none()
+
+def test_create_quiz_reads_from_primary(databases):
+    async def run():
+        async with db_session.AsyncSessionLocal() as db:
+            response = await create_quiz(QuizCreate.parse_obj(quiz_data("Created")), current_user=USER, db=db)
+        code = json.loads(response.body)["code"]
+
+        # Both the code and the id routes see the new quiz although the replica lacks it
+        assert await read_quiz(code, code) == code
+        quiz_id = next(key for key in db_session.recent_writes if isinstance(key, int))
+        assert db_session.read_session_for(quiz_id) is db_session.AsyncSessionLocal
+        assert await read_quiz("OTHER1", code) is None
+    asyncio.run(run())
+
+def test_import_quizzes_reads_from_primary(databases):
+    async def run():
+        lines = "\n".join(QuizCreate.parse_obj(quiz_data(f"Imported {i}")).json() for i in range(3))
+        upload = UploadFile(filename="quizzes.ndjson", file=io.BytesIO(lines.encode()))
+        async with db_session.AsyncSessionLocal() as db:
+            result = await import_quizzes(upload, format=None, current_user=USER, db=db)
+
+        assert result["imported"] == 3
+        for quiz in result["quizzes"]:
+            assert await read_quiz(quiz["code"], quiz["code"]) == quiz["code"]
+            assert db_session.read_session_for(quiz["id"]) is db_session.AsyncSessionLocal
+    asyncio.run(run())
+
+def test_reads_return_to_replica_after_lag_window(databases, monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_LAG_WINDOW", 0)
+
+    async def run():
+        async with db_session.AsyncSessionLocal() as db:
+            response = await create_quiz(QuizCreate.parse_obj(quiz_data("Created")), current_user=USER, db=db)
+        code = json.loads(response.body)["code"]
+
+        assert await read_quiz(code, code) is None
+        assert code not in db_session.recent_writes
+    asyncio.run(run())
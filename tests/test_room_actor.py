@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.websocket.actor import actor_stats, closing_tasks, room_actor, room_actors
+
+QUIZ_CODE = "ACT123"
+
+class FakeWebSocket:
+    def __init__(self, stall: bool = False, fail: bool = False):
+        self.stall = stall
+        self.fail = fail
+        self.sent = []
+        self.closed = None
+
+    async def send_text(self, text: str):
+        if self.fail:
+            raise ConnectionResetError("gone")
+        if self.stall:
+            await asyncio.sleep(3600)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed = code
+
+@pytest.fixture(autouse=True)
+def fast_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_TIMEOUT", 0.05)
+    room_actors.pop(QUIZ_CODE, None)
+    yield
+    room_actors.pop(QUIZ_CODE, None)
+
+def test_broadcast_drops_stalled_and_failed_members():
+    healthy, stalled, failing = FakeWebSocket(), FakeWebSocket(stall=True), FakeWebSocket(fail=True)
+    failures = actor_stats["send_failures"]
+
+    async def run():
+        actor = room_actor(QUIZ_CODE)
+        for user_id, websocket in enumerate((healthy, stalled, failing)):
+            actor.add(websocket, user_id)
+        await actor.call(actor.broadcast, {"type": "ping"})
+        await asyncio.gather(*closing_tasks)
+        return actor
+
+    actor = asyncio.run(run())
+    assert healthy.sent == ['{"type":"ping"}']
+    assert list(actor.members) == [healthy]
+    assert actor_stats["send_failures"] - failures == 2
+    assert (stalled.closed, failing.closed, healthy.closed) == (1013, 1013, None)
+
+def test_broadcast_skips_excluded_member():
+    sender, other = FakeWebSocket(), FakeWebSocket()
+
+    async def run():
+        actor = room_actor(QUIZ_CODE)
+        actor.add(sender, 1)
+        actor.add(other, 2)
+        await actor.call(actor.broadcast, {"type": "answer"}, sender)
+        # Only the excluded member: nothing to send
+        actor.discard(other)
+        await actor.call(actor.broadcast, {"type": "answer"}, sender)
+
+    asyncio.run(run())
+    assert sender.sent == []
+    assert other.sent == ['{"type":"answer"}']
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.websocket.rooms import QuizRoom, rooms
+from app.websocket.sessions import ReplayBuffer, open_session, replay_buffers, room_sessions, sessions
+from app.websocket.snapshot import HEADER, decode_state, encode_state, restore_snapshot, _write_file
+
+QUESTIONS = [
+    {"id": 1, "text": "Capital of France?", "options": ["Paris", "Lyon"], "correctAnswer": 0, "score": 10},
+    {"id": 2, "text": "2 + 2?", "options": ["3", "4", "5"], "correctAnswer": 1, "score": 5},
+]
+
+@pytest.fixture(autouse=True)
+def empty_state():
+    """Each test starts from, and leaves behind, no live state"""
+    for registry in (rooms, sessions, room_sessions, replay_buffers):
+        registry.clear()
+    yield
+    for registry in (rooms, sessions, room_sessions, replay_buffers):
+        registry.clear()
+
+def populate():
+    room = QuizRoom("ABC123", 7, QUESTIONS, 30, progressive=True)
+    room.advance()
+    room.answered.update({11, 12})
+    rooms[room.quiz_code] = room
+
+    session = open_session("ABC123", 7, 11, None)
+    buffer = replay_buffers["ABC123"] = ReplayBuffer(16)
+    buffer.append({"type": "room_participants", "participants": [{"id": "11", "email": "ünïcode@example.com"}]})
+    buffer.append({"type": "question_started", "question_id": 1})
+    return room, session
+
+def test_round_trip():
+    room, session = populate()
+    state = decode_state(encode_state())
+
+    [(code, quiz_id, time_limit, current, remaining, progressive, questions, answered)] = state["rooms"]
+    assert (code, quiz_id, time_limit, current, progressive) == ("ABC123", 7, 30, 0, True)
+    assert 29 < remaining <= 30
+    assert questions == QUESTIONS
+    assert sorted(answered) == [11, 12]
+
+    # A parked session keeps its own last_seq
+    assert state["sessions"] == [(session.token, "ABC123", 7, 11, 0)]
+
+    [(code, last_seq, frames)] = state["buffers"]
+    assert (code, last_seq) == ("ABC123", 2)
+    assert frames == list(replay_buffers["ABC123"].frames)
+
+def test_round_trip_empty():
+    state = decode_state(encode_state())
+    assert (state["rooms"], state["sessions"], state["buffers"]) == ([], [], [])
+
+def test_restore_from_file(tmp_path):
+    room, session = populate()
+    path = tmp_path / "room_state.snapshot"
+    _write_file(str(path), encode_state())
+    for registry in (rooms, sessions, room_sessions, replay_buffers):
+        registry.clear()
+
+    async def restore():
+        # Restoring schedules the room's timer and the session's expiry on the timer wheel
+        assert restore_snapshot(str(path)) is True
+        restored = rooms["ABC123"]
+        restored.close()
+        sessions[session.token].expiry.cancel()
+        return restored
+
+    restored = asyncio.run(restore())
+    assert restored.questions == QUESTIONS
+    assert restored.current == 0
+    assert restored.answered == {11, 12}
+    assert sessions[session.token].websocket is None  # Comes back parked
+    assert room_sessions == {"ABC123": {session.token}}
+    assert replay_buffers["ABC123"].last_seq == 2
+
+def test_corrupt_body_is_rejected():
+    populate()
+    data = bytearray(encode_state())
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        decode_state(bytes(data))
+
+def test_unknown_magic_is_rejected():
+    data = b"XXXX" + encode_state()[4:]
+    with pytest.raises(ValueError, match="format"):
+        decode_state(data)
+
+@pytest.mark.parametrize("keep", [HEADER.size // 2, HEADER.size + 10])
+def test_truncated_file_is_ignored(tmp_path, keep):
+    populate()
+    path = tmp_path / "room_state.snapshot"
+    path.write_bytes(encode_state()[:keep])
+    rooms.clear()
+    assert restore_snapshot(str(path)) is False
+    assert rooms == {}
+
+def test_missing_file_is_ignored(tmp_path):
+    assert restore_snapshot(str(tmp_path / "missing.snapshot")) is False
@@ -0,0 +1,77 @@
+import asyncio
+
+from app.core.timer_wheel import TimerWheel
+
+def run_ticks(wheel: TimerWheel, ticks: int):
+    """Advance the wheel by hand instead of waiting on its task"""
+    for _ in range(ticks):
+        wheel._advance()
+
+def with_wheel(test):
+    """Run `test(wheel)` on a loop, with the wheel's own task stopped"""
+    async def main():
+        wheel = TimerWheel(tick=0.01, slots=8)
+        test(wheel)
+        if wheel._task is not None:
+            wheel._task.cancel()
+    asyncio.run(main())
+
+def test_fires_after_delay():
+    def test(wheel):
+        fired = []
+        wheel.call_later(0.03, fired.append, "a")
+        run_ticks(wheel, 2)
+        assert fired == []
+        run_ticks(wheel, 1)
+        assert fired == ["a"]
+        assert wheel.pending == 0
+    with_wheel(test)
+
+def test_delay_longer_than_one_rotation():
+    def test(wheel):
+        fired = []
+        wheel.call_later(0.2, fired.append, "a")  # 20 ticks on 8 slots
+        run_ticks(wheel, 19)
+        assert fired == []
+        run_ticks(wheel, 1)
+        assert fired == ["a"]
+    with_wheel(test)
+
+def test_cancelled_timer_does_not_fire():
+    def test(wheel):
+        fired = []
+        handle = wheel.call_later(0.01, fired.append, "a")
+        handle.cancel()
+        run_ticks(wheel, 1)
+        assert fired == []
+        assert wheel.pending == 0
+    with_wheel(test)
+
+def test_reschedule_from_callback_into_the_same_slot():
+    def test(wheel):
+        fired = []
+
+        def callback():
+            fired.append(wheel.position)
+            if len(fired) == 1:
+                # A full rotation ahead hashes into the bucket being run
+                wheel.call_later(0.08, callback)
+
+        wheel.call_later(0.01, callback)
+        run_ticks(wheel, 1)
+        assert len(fired) == 1
+        run_ticks(wheel, 7)
+        assert len(fired) == 1
+        run_ticks(wheel, 1)
+        assert len(fired) == 2
+        assert wheel.pending == 0
+    with_wheel(test)
+
+def test_reschedule_keeps_timers_waiting_in_the_slot():
+    def test(wheel):
+        fired = []
+        wheel.call_later(0.01, lambda: wheel.call_later(0.08, fired.append, "rescheduled"))
+        wheel.call_later(0.09, fired.append, "next rotation")
+        run_ticks(wheel, 9)
+        assert sorted(fired) == ["next rotation", "rescheduled"]
+    with_wheel(test)
@@ -21,6 +21,9 @@ async def test_websocket():
                 try:
                     message = await websocket.recv()
                     print(f"Received message: {message}")
+                    # Answer the server's heartbeat, or the socket is closed as dead
+                    if json.loads(message).get("type") == "ping":
+                        await websocket.send(json.dumps({"type": "pong"}))
                 except websockets.exceptions.ConnectionClosed:
                     print("Connection closed")
                     break